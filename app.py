@@ -1,9 +1,10 @@
 import streamlit as st
 import os
+import random
+import threading
+from dataclasses import dataclass
 from firebase_manager import FirebaseManager
 from auth import login_page, signup_page, reset_password_page, logout_user
-from dashboard import display_dashboard
-from settings import display_settings
 import json
 
 # App title and configuration
@@ -14,8 +15,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Apply custom styling
-st.markdown("""
+@st.cache_data
+def _custom_css():
+    """Return the custom stylesheet, built once per process."""
+    return """
 <style>
     .main .block-container {
         padding-top: 2rem;
@@ -36,61 +39,100 @@ st.markdown("""
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Apply custom styling
+st.markdown(_custom_css(), unsafe_allow_html=True)
+
+# Default session state values
+_DEFAULTS = {
+    'logged_in': False,
+    'user_id': None,
+    'user_email': None,
+    'current_view': 'login',
+    'refresh_dashboard': False,
+    'demo_mode': False
+}
 
 # Initialize session state
-if 'logged_in' not in st.session_state:
-    st.session_state.logged_in = False
-if 'user_id' not in st.session_state:
-    st.session_state.user_id = None
-if 'user_email' not in st.session_state:
-    st.session_state.user_email = None
-if 'current_view' not in st.session_state:
-    st.session_state.current_view = 'login'
-if 'refresh_dashboard' not in st.session_state:
-    st.session_state.refresh_dashboard = False
-if 'firebase_initialized' not in st.session_state:
-    st.session_state.firebase_initialized = False
+for key, value in _DEFAULTS.items():
+    st.session_state.setdefault(key, value)
 
-# For demo purposes, create a placeholder for Firebase credentials
-# In a production environment, these would be stored securely in environment variables
-def init_firebase():
-    """Initialize Firebase with credentials from environment or placeholder values for demo."""
-    if st.session_state.firebase_initialized:
-        return st.session_state.firebase_manager
-    
-    # Try to get Firebase credentials from environment variables
-    api_key = os.getenv("FIREBASE_API_KEY", "")
-    auth_domain = os.getenv("FIREBASE_AUTH_DOMAIN", "")
-    database_url = os.getenv("FIREBASE_DATABASE_URL", "")
-    storage_bucket = os.getenv("FIREBASE_STORAGE_BUCKET", "")
-    service_account_key = os.getenv("FIREBASE_SERVICE_ACCOUNT", "")
+@dataclass(frozen=True)
+class FirebaseConfig:
+    """Firebase credentials read from the environment."""
+    api_key: str
+    auth_domain: str
+    database_url: str
+    storage_bucket: str
+    service_account: dict = None
+
+def _load_service_account(raw):
+    """Parse the service account JSON, returning None if it is missing or invalid."""
+    if not raw:
+        return None
     
-    # For demo purposes, if no credentials are found, use placeholder values
-    # and simulate a connection
-    if not (api_key and auth_domain and database_url):
-        if 'demo_mode' not in st.session_state:
-            st.session_state.demo_mode = True
-            st.warning("⚠️ Running in demo mode with simulated data. No actual Firebase connection.")
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as e:
+        print(f"Error parsing FIREBASE_SERVICE_ACCOUNT: {str(e)}")
+        return None
+
+# Firebase credentials are read and parsed once at import time
+FIREBASE_CONFIG = FirebaseConfig(
+    api_key=os.getenv("FIREBASE_API_KEY", ""),
+    auth_domain=os.getenv("FIREBASE_AUTH_DOMAIN", ""),
+    database_url=os.getenv("FIREBASE_DATABASE_URL", ""),
+    storage_bucket=os.getenv("FIREBASE_STORAGE_BUCKET", ""),
+    service_account=_load_service_account(os.getenv("FIREBASE_SERVICE_ACCOUNT", ""))
+)
 
-    # Initialize Firebase manager
-    firebase_manager = FirebaseManager(
-        api_key=api_key,
-        auth_domain=auth_domain,
-        database_url=database_url,
-        storage_bucket=storage_bucket,
-        service_account_key=service_account_key
-    )
+# Number of FirebaseManager instances shared between sessions
+FIREBASE_POOL_SIZE = int(os.getenv("FIREBASE_POOL_SIZE", "4"))
+
+@st.cache_resource
+def _firebase_pool(_config, size):
+    """
+    Create the pool of FirebaseManager instances shared by every user session.
     
-    st.session_state.firebase_manager = firebase_manager
-    st.session_state.firebase_initialized = True
+    Streamlit caches the returned list process-wide, so the connection
+    setup happens once instead of once per session. Spreading sessions
+    over several managers keeps one busy connection from delaying the rest.
+    The config is a module constant, so it is left out of the cache key.
+    """
+    pool = []
+    for _ in range(max(1, size)):
+        firebase_manager = FirebaseManager(
+            api_key=_config.api_key,
+            auth_domain=_config.auth_domain,
+            database_url=_config.database_url,
+            storage_bucket=_config.storage_bucket,
+            service_account_key=_config.service_account
+        )
+        
+        # Open the Firebase connection in the background so the first login
+        # doesn't pay for the handshake
+        threading.Thread(target=firebase_manager.warmup, daemon=True).start()
+        pool.append(firebase_manager)
     
-    return firebase_manager
+    return pool
+
+def get_firebase_manager():
+    """Return a FirebaseManager from the shared pool."""
+    pool = _firebase_pool(FIREBASE_CONFIG, FIREBASE_POOL_SIZE)
+    return random.choice(pool)
 
 def main():
     """Main application function."""
-    # Initialize Firebase
-    firebase_manager = init_firebase()
+    # Get a Firebase manager from the shared pool
+    firebase_manager = get_firebase_manager()
+    
+    # For demo purposes, if no credentials are found, use placeholder values
+    # and simulate a connection
+    if not (FIREBASE_CONFIG.api_key and FIREBASE_CONFIG.auth_domain and FIREBASE_CONFIG.database_url):
+        if not st.session_state.demo_mode:
+            st.session_state.demo_mode = True
+            st.warning("⚠️ Running in demo mode with simulated data. No actual Firebase connection.")
     
     # Display app header
     st.sidebar.image("generated-icon.png", width=100)
@@ -98,16 +140,28 @@ def main():
     
     # Handle authentication and display appropriate view
     if not st.session_state.logged_in:
-        # Authentication views
-        auth_option = st.sidebar.radio("Authentication", ["Login", "Sign Up", "Reset Password"])
+        # Authentication views, rendered into placeholders so they can be
+        # cleared if the user logs in during this run
+        auth_sidebar = st.sidebar.empty()
+        auth_view = st.empty()
+        
+        auth_option = auth_sidebar.radio("Authentication", ["Login", "Sign Up", "Reset Password"])
         
-        if auth_option == "Login":
-            login_page(firebase_manager)
-        elif auth_option == "Sign Up":
-            signup_page(firebase_manager)
-        else:
-            reset_password_page(firebase_manager)
-    else:
+        with auth_view.container():
+            if auth_option == "Login":
+                login_page(firebase_manager)
+            elif auth_option == "Sign Up":
+                signup_page(firebase_manager)
+            else:
+                reset_password_page(firebase_manager)
+        
+        # A successful login falls through to the dashboard on the same run
+        # instead of re-executing the whole script
+        if st.session_state.logged_in:
+            auth_sidebar.empty()
+            auth_view.empty()
+    
+    if st.session_state.logged_in:
         # User is logged in, display main navigation
         navigation = st.sidebar.radio("Navigation", ["Dashboard", "Settings", "Logout"])
         
@@ -115,9 +169,13 @@ def main():
         st.sidebar.write(f"Logged in as: {st.session_state.user_email}")
         
         # Handle navigation
+        # Page modules pull in pandas/plotly, so they are only imported
+        # once the user is logged in
         if navigation == "Dashboard":
+            from dashboard import display_dashboard
             display_dashboard(firebase_manager)
         elif navigation == "Settings":
+            from settings import display_settings
             display_settings(firebase_manager)
         else:  # Logout
             logout_user()
@@ -1,11 +1,32 @@
 import streamlit as st
+import hashlib
+import hmac
 import re
+import string
 from firebase_manager import FirebaseManager
 
+# Email pattern, compiled once at import
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+
+# Demo account credentials (the password is kept as its SHA-256 digest)
+_DEMO_EMAIL = "demo@example.com"
+_DEMO_PASSWORD_HASH = bytes.fromhex("b22f213ec710f0b0e86297d10279d69171f50f01a04edf40f472a563e7ad8576")
+
+# Character classes required in a password
+_UPPERCASE = frozenset(string.ascii_uppercase)
+_LOWERCASE = frozenset(string.ascii_lowercase)
+
 def validate_email(email):
     """Validate email format."""
-    pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-    return bool(re.match(pattern, email))
+    # Reject obviously invalid input before running the regex
+    if len(email) > 254 or email.count('@') != 1:
+        return False
+    
+    local, _, domain = email.rpartition('@')
+    if not local or '.' not in domain:
+        return False
+    
+    return bool(_EMAIL_RE.match(email))
 
 def validate_password(password):
     """Validate password strength."""
@@ -14,13 +35,17 @@ def validate_password(password):
         return False, "Password must be at least 8 characters long."
     
     # Check if password contains at least one uppercase letter, one lowercase letter, and one digit
-    if not re.search(r"[A-Z]", password):
+    # (the password is scanned once and each class checked against its character set)
+    chars = set(password)
+    
+    if chars.isdisjoint(_UPPERCASE):
         return False, "Password must contain at least one uppercase letter."
     
-    if not re.search(r"[a-z]", password):
+    if chars.isdisjoint(_LOWERCASE):
         return False, "Password must contain at least one lowercase letter."
     
-    if not re.search(r"\d", password):
+    # Any Unicode decimal digit counts, as a \d regex would match
+    if not any(char.isdecimal() for char in chars):
         return False, "Password must contain at least one digit."
     
     return True, "Password is valid."
@@ -46,34 +71,39 @@ def login_page(firebase_manager: FirebaseManager):
                 return
             
             # Demo mode with simulated login
-            if 'demo_mode' in st.session_state and st.session_state.demo_mode:
+            if st.session_state.demo_mode:
                 # Simulate successful login in demo mode
-                if email == "demo@example.com" and password == "Demo1234":
-                    st.session_state.logged_in = True
-                    st.session_state.user_id = "demo_user_id"
-                    st.session_state.user_email = email
-                    st.session_state.current_view = 'dashboard'
+                password_hash = hashlib.sha256(password.encode()).digest()
+                del password
+                if email == _DEMO_EMAIL and hmac.compare_digest(password_hash, _DEMO_PASSWORD_HASH):
+                    st.session_state.update({
+                        'logged_in': True,
+                        'user_id': "demo_user_id",
+                        'user_email': email,
+                        'current_view': 'dashboard'
+                    })
                     st.success("Login successful!")
-                    st.rerun()
                 else:
                     st.error("In demo mode, use email 'demo@example.com' and password 'Demo1234'")
                 return
             
             # Attempt login with Firebase
             user = firebase_manager.login_user(email, password)
+            del password
             
             if user:
-                st.session_state.logged_in = True
-                st.session_state.user_id = user.get('localId')
-                st.session_state.user_email = email
-                st.session_state.current_view = 'dashboard'
+                st.session_state.update({
+                    'logged_in': True,
+                    'user_id': user.get('localId'),
+                    'user_email': email,
+                    'current_view': 'dashboard'
+                })
                 st.success("Login successful!")
-                st.rerun()
             else:
                 st.error("Login failed. Please check your email and password.")
     
     # Demo mode notice
-    if 'demo_mode' in st.session_state and st.session_state.demo_mode:
+    if st.session_state.demo_mode:
         st.info("🔍 Demo Mode: Use email 'demo@example.com' and password 'Demo1234' to log in.")
 
 def signup_page(firebase_manager: FirebaseManager):
@@ -107,13 +137,14 @@ def signup_page(firebase_manager: FirebaseManager):
                 return
             
             # Demo mode with simulated sign up
-            if 'demo_mode' in st.session_state and st.session_state.demo_mode:
+            if st.session_state.demo_mode:
                 st.success("Account created successfully in demo mode!")
                 st.info("Now you can login with the credentials you just created.")
                 return
             
             # Attempt to create user with Firebase
             user = firebase_manager.create_user(email, password)
+            del password, confirm_password
             
             if user:
                 st.success("Account created successfully!")
@@ -122,7 +153,7 @@ def signup_page(firebase_manager: FirebaseManager):
                 st.error("Failed to create account. The email might already be registered.")
     
     # Demo mode notice
-    if 'demo_mode' in st.session_state and st.session_state.demo_mode:
+    if st.session_state.demo_mode:
         st.info("🔍 Demo Mode: Account creation is simulated and won't persist.")
 
 def reset_password_page(firebase_manager: FirebaseManager):
@@ -144,7 +175,7 @@ def reset_password_page(firebase_manager: FirebaseManager):
                 return
             
             # Demo mode with simulated password reset
-            if 'demo_mode' in st.session_state and st.session_state.demo_mode:
+            if st.session_state.demo_mode:
                 st.success("Password reset link sent in demo mode!")
                 st.info("In a real environment, you would receive an email with password reset instructions.")
                 return
@@ -157,12 +188,14 @@ def reset_password_page(firebase_manager: FirebaseManager):
                 st.error(f"Error sending password reset link: {str(e)}")
     
     # Demo mode notice
-    if 'demo_mode' in st.session_state and st.session_state.demo_mode:
+    if st.session_state.demo_mode:
         st.info("🔍 Demo Mode: Password reset is simulated and no actual email will be sent.")
 
 def logout_user():
     """Handle the logout process."""
-    st.session_state.logged_in = False
-    st.session_state.user_id = None
-    st.session_state.user_email = None
-    st.session_state.current_view = 'login'
\ No newline at end of file
+    st.session_state.update({
+        'logged_in': False,
+        'user_id': None,
+        'user_email': None,
+        'current_view': 'login'
+    })
\ No newline at end of file
@@ -1,13 +1,217 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import json
+from concurrent.futures import ThreadPoolExecutor
+import io
+import time
+from typing import NamedTuple
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from types import MappingProxyType
 from firebase_manager import FirebaseManager
 from data_processing import get_real_time_data, get_historical_data, detect_anomalies
 from utils import check_alerts, format_volume, format_timestamp
+from settings import load_user_settings
+
+# Alert thresholds used when no user is logged in
+DEFAULT_THRESHOLDS = MappingProxyType({
+    "pressure_high": 6.0,
+    "pressure_low": 1.0,
+    "flow_high": 20.0,
+    "daily_usage_high": 500.0
+})
+
+# Static gauge settings; only the value changes between renders
+FLOW_GAUGE = MappingProxyType({
+    'mode': "gauge+number",
+    'domain': {'x': [0, 1], 'y': [0, 1]},
+    'title': {'text': "Flow Rate (L/min)"},
+    'gauge': {
+        'axis': {'range': [0, 30], 'tickwidth': 1},
+        'bar': {'color': "#1f77b4"},
+        'steps': [
+            {'range': [0, 5], 'color': "lightblue"},
+            {'range': [5, 15], 'color': "royalblue"},
+            {'range': [15, 30], 'color': "darkblue"}
+        ],
+        'threshold': {
+            'line': {'color': "red", 'width': 4},
+            'thickness': 0.75,
+            'value': 25
+        }
+    }
+})
+
+PRESSURE_GAUGE = MappingProxyType({
+    'mode': "gauge+number",
+    'domain': {'x': [0, 1], 'y': [0, 1]},
+    'title': {'text': "Pressure (bar)"},
+    'gauge': {
+        'axis': {'range': [0, 10], 'tickwidth': 1},
+        'bar': {'color': "#ff7f0e"},
+        'steps': [
+            {'range': [0, 2], 'color': "lightyellow"},
+            {'range': [2, 6], 'color': "gold"},
+            {'range': [6, 10], 'color': "orange"}
+        ],
+        'threshold': {
+            'line': {'color': "red", 'width': 4},
+            'thickness': 0.75,
+            'value': 8
+        }
+    }
+})
+
+# Worker threads for the dashboard's independent Firebase fetches
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=6, thread_name_prefix="dashboard-fetch")
+
+def _submit_fetch(fn, *args):
+    """
+    Run a cached fetch on the fetch pool under the current script run.
+    
+    st.cache_data functions need the script run context of the session that
+    calls them, which pool threads don't have, so it is attached before the
+    call.
+    
+    Args:
+        fn: Function to run
+        *args: Arguments for fn
+        
+    Returns:
+        Future: Future for the result of fn
+    """
+    ctx = get_script_run_ctx()
+    
+    def run():
+        add_script_run_ctx(ctx=ctx)
+        return fn(*args)
+    
+    return _FETCH_EXECUTOR.submit(run)
+
+# The FirebaseManager argument is prefixed with an underscore so Streamlit
+# leaves it out of the cache key
+
+@st.cache_data(ttl=2, show_spinner=False)
+def _cached_real_time(_firebase_manager):
+    """Get real-time data, cached briefly across reruns."""
+    return get_real_time_data(_firebase_manager)
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def _cached_historical(_firebase_manager, start_ts, end_ts):
+    """Get historical data for a time range, cached for a minute across reruns."""
+    return get_historical_data(_firebase_manager, start_ts, end_ts)
+
+def get_thresholds(firebase_manager, user_id):
+    """Get a user's alert thresholds from the settings cache, which saves keep current."""
+    user_settings = load_user_settings(firebase_manager, user_id)
+    return user_settings.get('alert_thresholds', {}) if user_settings else {}
+
+# Demo flow multipliers indexed by hour of day
+DAILY_PATTERN = np.array([
+    0.3,  # Midnight
+    0.2, 0.1, 0.1, 0.2, 0.5,
+    1.0,  # Morning peak
+    1.5, 1.2, 0.8, 0.7, 0.8,
+    1.0,  # Lunch time
+    0.9, 0.7, 0.6, 0.7,
+    1.2,  # Evening peak
+    1.8, 1.5, 1.2, 0.9, 0.6, 0.4
+], dtype=np.float32)
+DAILY_PATTERN.setflags(write=False)
+
+class DemoData(NamedTuple):
+    """Demo data shown when the app runs without Firebase."""
+    real_time: dict
+    historical: pd.DataFrame
+    alerts: list
+
+@st.cache_data(ttl=60, max_entries=2, show_spinner=False)
+def generate_demo_data(minute):
+    """
+    Generate demo data for the dashboard when no real data is available.
+    
+    Args:
+        minute: Current minute (Unix time // 60), used as the cache key and RNG seed
+        
+    Returns:
+        DemoData: Real-time reading, historical DataFrame and alerts
+    """
+    rng = np.random.default_rng(minute)
+    
+    # Current time
+    now = datetime.now().timestamp()
+    
+    # Real-time data
+    real_time = {
+        'timestamp': now,
+        'flow_rate': 8.5,
+        'pressure': 3.2,
+        'volume': 0.5,
+        'hourly_usage': 22.8,
+        'daily_usage': 245.6
+    }
+    
+    # Historical data
+    start = datetime.now() - timedelta(days=7)
+    dates = pd.date_range(start=start, end=datetime.now(), freq='1H')
+    n = len(dates)
+    timestamps = int(start.timestamp()) + np.arange(n, dtype=np.int64) * 3600
+    
+    # Base flow rate with pattern and random variations (float32 is plenty
+    # for charts and halves the memory and payload of the demo frame)
+    hours = dates.hour.to_numpy()
+    flow_noise = rng.standard_normal(n, dtype=np.float32) * 0.1
+    flow_rate = np.maximum(0, DAILY_PATTERN[hours] * 8.0 * (1 + flow_noise))
+    
+    # Base pressure with random variations
+    pressure = np.maximum(0.5, 3.5 + rng.standard_normal(n, dtype=np.float32) * 0.2)
+    
+    # Volume calculation (flow rate * 60 minutes / 1000 to get liters)
+    volume = flow_rate * 60 / 1000
+    
+    # Running hourly and daily usage, restarting at each new hour/day
+    # (group keys stay datetime64 rather than per-row Python date objects)
+    volume_series = pd.Series(volume)
+    hourly_usage = volume_series.groupby(dates.floor('1h')).cumsum().to_numpy()
+    daily_usage = volume_series.groupby(dates.normalize()).cumsum().to_numpy()
+    
+    # Add some anomalies for demonstration (skipping the first entry); the
+    # arrays are scaled in place before the DataFrame is built
+    anomaly_indices = rng.choice(n - 1, size=3, replace=False) + 1
+    flow_rate[anomaly_indices] *= 3
+    pressure[anomaly_indices] *= 1.5
+    
+    # Create DataFrame (the arrays are freshly built, so pandas can adopt
+    # them without copying)
+    historical = pd.DataFrame({
+        'timestamp': timestamps,
+        'flow_rate': flow_rate,
+        'pressure': pressure,
+        'volume': volume,
+        'hourly_usage': hourly_usage,
+        'daily_usage': daily_usage
+    }, copy=False)
+    
+    # Alerts
+    alerts = [
+        {
+            'timestamp': now - 3600,  # 1 hour ago
+            'message': "Unusual water flow detected (20.5 L/min) at 14:30",
+            'severity': 'high'
+        },
+        {
+            'timestamp': now - 7200,  # 2 hours ago
+            'message': "Daily water usage exceeded threshold (510.2 L)",
+            'severity': 'medium'
+        },
+        {
+            'timestamp': now - 86400,  # 1 day ago
+            'message': "Sensor connection restored after 5 minutes offline",
+            'severity': 'info'
+        }
+    ]
+    
+    return DemoData(real_time=real_time, historical=historical, alerts=alerts)
 
 def display_dashboard(firebase_manager: FirebaseManager):
     """
@@ -20,31 +224,30 @@ def display_dashboard(firebase_manager: FirebaseManager):
     
     # Demo mode for simulated data
     if 'demo_mode' in st.session_state and st.session_state.demo_mode:
-        demo_data = generate_demo_data()
-        real_time_tab(tabs[0], demo_data.get("real_time", {}))
-        historical_tab(tabs[1], demo_data.get("historical", pd.DataFrame()))
-        alerts_tab(tabs[2], demo_data.get("alerts", []))
-        export_tab(tabs[3], demo_data.get("historical", pd.DataFrame()))
+        demo_data = generate_demo_data(int(time.time()) // 60)
+        real_time_tab(tabs[0], demo_data.real_time)
+        historical_tab(tabs[1], demo_data.historical)
+        alerts_tab(tabs[2], demo_data.alerts)
+        export_tab(tabs[3], demo_data.historical)
     else:
-        # Get real-time data
-        real_time_data = get_real_time_data(firebase_manager)
+        # Get historical data for the past 7 days (the range is rounded to
+        # the minute so reruns within a minute share a cache entry)
+        end_ts = int(datetime.now().timestamp()) // 60 * 60
+        start_ts = end_ts - int(timedelta(days=7).total_seconds())
         
-        # Get historical data for the past 7 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        historical_data = get_historical_data(firebase_manager, start_date.timestamp(), end_date.timestamp())
+        # The real-time and historical requests are independent, so issue
+        # them in parallel while the settings are read on this thread
+        real_time_future = _submit_fetch(_cached_real_time, firebase_manager)
+        historical_future = _submit_fetch(_cached_historical, firebase_manager, start_ts, end_ts)
         
         # Check for any alerts
         if 'user_id' in st.session_state and st.session_state.user_id:
-            user_settings = firebase_manager.get_user_settings(st.session_state.user_id)
-            thresholds = user_settings.get('alert_thresholds', {}) if user_settings else {}
+            thresholds = get_thresholds(firebase_manager, st.session_state.user_id)
         else:
-            thresholds = {
-                "pressure_high": 6.0,
-                "pressure_low": 1.0,
-                "flow_high": 20.0,
-                "daily_usage_high": 500.0
-            }
+            thresholds = DEFAULT_THRESHOLDS
+        
+        real_time_data = real_time_future.result()
+        historical_data = historical_future.result()
         
         alerts = check_alerts(real_time_data, thresholds)
         
@@ -54,6 +257,14 @@ def display_dashboard(firebase_manager: FirebaseManager):
         alerts_tab(tabs[2], alerts)
         export_tab(tabs[3], historical_data)
 
+def gauge_figure(settings, value):
+    """Build a gauge figure from one of the static gauge settings."""
+    # Plotly is imported where figures are built so loading the dashboard
+    # module doesn't pay for it up front (the import is cached after the first call)
+    import plotly.graph_objects as go
+    
+    return go.Figure(go.Indicator(value=value, **settings))
+
 def real_time_tab(tab, data):
     """Display real-time water monitoring data."""
     with tab:
@@ -75,27 +286,8 @@ def real_time_tab(tab, data):
             st.metric("Flow Rate", f"{flow_rate:.1f} L/min", delta=None)
             
             # Create a gauge chart for flow rate
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=flow_rate,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "Flow Rate (L/min)"},
-                gauge={
-                    'axis': {'range': [0, 30], 'tickwidth': 1},
-                    'bar': {'color': "#1f77b4"},
-                    'steps': [
-                        {'range': [0, 5], 'color': "lightblue"},
-                        {'range': [5, 15], 'color': "royalblue"},
-                        {'range': [15, 30], 'color': "darkblue"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 25
-                    }
-                }
-            ))
-            st.plotly_chart(fig, use_container_width=True)
+            fig = gauge_figure(FLOW_GAUGE, flow_rate)
+            st.plotly_chart(fig, use_container_width=True, key="flow_gauge")
         
         with col2:
             # Pressure gauge
@@ -103,27 +295,8 @@ def real_time_tab(tab, data):
             st.metric("Pressure", f"{pressure:.1f} bar", delta=None)
             
             # Create a gauge chart for pressure
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=pressure,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "Pressure (bar)"},
-                gauge={
-                    'axis': {'range': [0, 10], 'tickwidth': 1},
-                    'bar': {'color': "#ff7f0e"},
-                    'steps': [
-                        {'range': [0, 2], 'color': "lightyellow"},
-                        {'range': [2, 6], 'color': "gold"},
-                        {'range': [6, 10], 'color': "orange"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 8
-                    }
-                }
-            ))
-            st.plotly_chart(fig, use_container_width=True)
+            fig = gauge_figure(PRESSURE_GAUGE, pressure)
+            st.plotly_chart(fig, use_container_width=True, key="pressure_gauge")
         
         with col3:
             # Water usage metrics
@@ -137,8 +310,55 @@ def real_time_tab(tab, data):
             st.write("### Connectivity")
             st.success("Sensor Online ✅")
 
+# Lookback window and resampling rule for each historical time range
+HISTORY_RANGES = MappingProxyType({
+    "Last 24 Hours": (timedelta(hours=24), '15min'),
+    "Last 3 Days": (timedelta(days=3), '1H'),
+    "Last Week": (timedelta(days=7), '2H'),
+    "Last Month": (timedelta(days=30), '6H')
+})
+
+@st.cache_data(ttl=60, max_entries=16, show_spinner=False)
+def prepare_history(_data, time_range, n_rows, last_timestamp):
+    """
+    Filter historical data to a time range and resample it for plotting.
+    
+    Args:
+        _data: DataFrame of historical readings with a 'timestamp' column
+        time_range: Key of HISTORY_RANGES
+        n_rows: Number of rows in the data (part of the cache key)
+        last_timestamp: Timestamp of the last reading (part of the cache key)
+        
+    Returns:
+        tuple: (filtered_data, resampled_data, anomalies) where anomalies maps
+        'flow_rate' and 'pressure' to boolean masks over resampled_data
+    """
+    lookback, rule = HISTORY_RANGES[time_range]
+    
+    # Work on a copy of the needed columns so the caller's DataFrame is not modified
+    columns = [c for c in ('flow_rate', 'pressure', 'volume') if c in _data.columns]
+    view = _data[columns].copy()
+    
+    # Data from get_historical_data is already indexed by datetime; demo data is not
+    if not isinstance(view.index, pd.DatetimeIndex):
+        view.index = pd.to_datetime(_data['timestamp'], unit='s').rename('datetime')
+    
+    filtered_data = view[view.index >= (datetime.now() - lookback)]
+    resampled_data = filtered_data.resample(rule).mean().ffill()
+    
+    # Detect anomalies here so they are computed once per range, not on every rerun
+    anomalies = {
+        column: detect_anomalies(resampled_data, column)
+        for column in ('flow_rate', 'pressure')
+    }
+    
+    return filtered_data, resampled_data, anomalies
+
 def historical_tab(tab, data):
     """Display historical water usage and pressure data."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     with tab:
         st.subheader("Historical Water Usage")
         
@@ -146,37 +366,14 @@ def historical_tab(tab, data):
             # Time range selector
             time_range = st.selectbox(
                 "Select Time Range",
-                ["Last 24 Hours", "Last 3 Days", "Last Week", "Last Month"],
+                list(HISTORY_RANGES),
                 index=2
             )
             
-            # Convert timestamps to datetime for better visualization
-            data['datetime'] = pd.to_datetime(data['timestamp'], unit='s')
-            data.set_index('datetime', inplace=True)
-            
-            # Filter data based on selected time range
-            now = datetime.now()
-            if time_range == "Last 24 Hours":
-                filtered_data = data[data.index >= (now - timedelta(hours=24))]
-            elif time_range == "Last 3 Days":
-                filtered_data = data[data.index >= (now - timedelta(days=3))]
-            elif time_range == "Last Week":
-                filtered_data = data[data.index >= (now - timedelta(days=7))]
-            else:  # Last Month
-                filtered_data = data[data.index >= (now - timedelta(days=30))]
-            
-            # Resample data for better visualization
-            if time_range == "Last 24 Hours":
-                resampled_data = filtered_data.resample('15min').mean()
-            elif time_range == "Last 3 Days":
-                resampled_data = filtered_data.resample('1H').mean()
-            elif time_range == "Last Week":
-                resampled_data = filtered_data.resample('2H').mean()
-            else:  # Last Month
-                resampled_data = filtered_data.resample('6H').mean()
-            
-            # Fill NaN values
-            resampled_data = resampled_data.fillna(method='ffill')
+            # Filter and resample the data once for all visualizations
+            filtered_data, resampled_data, anomalies = prepare_history(
+                data, time_range, len(data), data['timestamp'].iloc[-1]
+            )
             
             # Visualization options
             visualization = st.radio(
@@ -186,18 +383,21 @@ def historical_tab(tab, data):
             )
             
             if visualization == "Water Usage":
+                # Aggregate the raw readings to hourly totals once; both charts
+                # are built from this much smaller series
+                hourly_usage = filtered_data['volume'].resample('1H').sum()
+                
                 # Cumulative usage visualization
-                daily_usage = filtered_data['volume'].resample('1D').sum().cumsum()
+                daily_usage = hourly_usage.resample('1D').sum().cumsum()
                 
                 fig = px.bar(
                     daily_usage,
                     labels={"value": "Water Usage (L)", "datetime": "Date"},
                     title="Cumulative Daily Water Usage"
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="daily_usage_chart")
                 
                 # Hourly usage patterns
-                hourly_usage = filtered_data['volume'].resample('1H').sum()
                 hourly_avg = hourly_usage.groupby(hourly_usage.index.hour).mean()
                 
                 fig = px.bar(
@@ -205,20 +405,20 @@ def historical_tab(tab, data):
                     labels={"value": "Average Usage (L)", "index": "Hour of Day"},
                     title="Average Hourly Water Usage"
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="hourly_usage_chart")
                 
             elif visualization == "Flow Rate":
                 # Flow rate over time
                 fig = px.line(
                     resampled_data,
                     y='flow_rate',
+                    render_mode='webgl',
                     labels={"flow_rate": "Flow Rate (L/min)", "datetime": "Date"},
                     title="Water Flow Rate Over Time"
                 )
                 
                 # Add anomaly detection
-                anomalies = detect_anomalies(resampled_data, 'flow_rate')
-                anomaly_points = resampled_data[anomalies]
+                anomaly_points = resampled_data[anomalies['flow_rate']]
                 
                 if not anomaly_points.empty:
                     fig.add_scatter(
@@ -229,29 +429,24 @@ def historical_tab(tab, data):
                         name='Anomalies'
                     )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="flow_rate_chart")
                 
                 # Flow rate distribution
-                fig = px.histogram(
-                    filtered_data,
-                    x='flow_rate',
-                    labels={"flow_rate": "Flow Rate (L/min)", "count": "Frequency"},
-                    title="Flow Rate Distribution"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                fig = histogram_figure(filtered_data['flow_rate'], "Flow Rate Distribution", "Flow Rate (L/min)")
+                st.plotly_chart(fig, use_container_width=True, key="flow_rate_histogram")
                 
             elif visualization == "Pressure":
                 # Pressure over time
                 fig = px.line(
                     resampled_data,
                     y='pressure',
+                    render_mode='webgl',
                     labels={"pressure": "Pressure (bar)", "datetime": "Date"},
                     title="Water Pressure Over Time"
                 )
                 
                 # Add anomaly detection
-                anomalies = detect_anomalies(resampled_data, 'pressure')
-                anomaly_points = resampled_data[anomalies]
+                anomaly_points = resampled_data[anomalies['pressure']]
                 
                 if not anomaly_points.empty:
                     fig.add_scatter(
@@ -262,23 +457,18 @@ def historical_tab(tab, data):
                         name='Anomalies'
                     )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="pressure_chart")
                 
                 # Pressure histogram
-                fig = px.histogram(
-                    filtered_data,
-                    x='pressure',
-                    labels={"pressure": "Pressure (bar)", "count": "Frequency"},
-                    title="Pressure Distribution"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                fig = histogram_figure(filtered_data['pressure'], "Pressure Distribution", "Pressure (bar)")
+                st.plotly_chart(fig, use_container_width=True, key="pressure_histogram")
                 
             else:  # Compare All
                 # Combined visualization
                 fig = go.Figure()
                 
                 # Add flow rate
-                fig.add_trace(go.Scatter(
+                fig.add_trace(go.Scattergl(
                     x=resampled_data.index,
                     y=resampled_data['flow_rate'],
                     name='Flow Rate (L/min)',
@@ -286,7 +476,7 @@ def historical_tab(tab, data):
                 ))
                 
                 # Add pressure on secondary y-axis
-                fig.add_trace(go.Scatter(
+                fig.add_trace(go.Scattergl(
                     x=resampled_data.index,
                     y=resampled_data['pressure'],
                     name='Pressure (bar)',
@@ -314,7 +504,7 @@ def historical_tab(tab, data):
                     legend=dict(x=0.01, y=0.99)
                 )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="compare_chart")
         else:
             st.info("No historical data available for the selected time range.")
             
@@ -338,7 +528,30 @@ def historical_tab(tab, data):
                     labels={"value": "Measurement", "datetime": "Date", "variable": "Metric"},
                     title="Sample Historical Data (Demo)"
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="demo_history_chart")
+
+def histogram_figure(values, title, x_label, bins=64):
+    """
+    Build a histogram from bin counts computed on the server.
+    
+    Only the bin counts are sent to the browser instead of every raw sample.
+    """
+    import plotly.graph_objects as go
+    
+    counts, edges = np.histogram(values.dropna().to_numpy(), bins=bins)
+    
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges)
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis=dict(title=x_label),
+        yaxis=dict(title="Frequency"),
+        bargap=0
+    )
+    return fig
 
 def alerts_tab(tab, alerts):
     """Display water monitoring alerts."""
@@ -357,6 +570,13 @@ def alerts_tab(tab, alerts):
         else:
             st.success("No active alerts. Your water system is functioning normally.")
 
+def csv_bytes(df):
+    """Encode a DataFrame as CSV bytes for a download button."""
+    # Write straight into a bytes buffer so the CSV is not held as a Python string first
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, date_format='%Y-%m-%d %H:%M:%S')
+    return buffer.getvalue()
+
 def export_tab(tab, data):
     """Allow exporting of historical data."""
     with tab:
@@ -389,13 +609,20 @@ def export_tab(tab, data):
             start_datetime = datetime.combine(start_date, datetime.min.time())
             end_datetime = datetime.combine(end_date, datetime.max.time())
             
-            filtered_data = data[(data['datetime'] >= start_datetime) & (data['datetime'] <= end_datetime)]
+            # Readings are sorted by time, so the range bounds can be found by binary search
+            if not data['datetime'].is_monotonic_increasing:
+                data = data.sort_values('datetime')
+            times = data['datetime'].to_numpy()
+            lo = times.searchsorted(np.datetime64(start_datetime), side='left')
+            hi = times.searchsorted(np.datetime64(end_datetime), side='right')
+            filtered_data = data.iloc[lo:hi]
             
             # Format the data
             if not filtered_data.empty:
-                # Convert to readable format
+                # Round to whole seconds; csv_bytes formats datetime64 values
+                # as "YYYY-MM-DD HH:MM:SS" without per-row strftime calls
                 export_data = filtered_data.copy()
-                export_data['datetime'] = export_data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+                export_data['datetime'] = export_data['datetime'].dt.floor('s')
                 
                 # Export options
                 export_format = st.selectbox(
@@ -405,15 +632,18 @@ def export_tab(tab, data):
                 )
                 
                 if export_format == "CSV":
-                    csv = export_data.to_csv(index=False)
                     st.download_button(
                         label="Download CSV",
-                        data=csv,
+                        data=csv_bytes(export_data),
                         file_name=f"water_data_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv",
                         mime="text/csv"
                     )
                 elif export_format == "JSON":
-                    json_data = export_data.to_json(orient="records")
+                    # to_json has no "YYYY-MM-DD HH:MM:SS" date format, so the
+                    # column is formatted as text for this export only
+                    json_data = export_data.assign(
+                        datetime=export_data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+                    ).to_json(orient="records")
                     st.download_button(
                         label="Download JSON",
                         data=json_data,
@@ -422,10 +652,9 @@ def export_tab(tab, data):
                     )
                 else:  # Excel
                     # For Streamlit, we'll use a workaround for Excel downloads
-                    csv = export_data.to_csv(index=False)
                     st.download_button(
                         label="Download Excel (CSV format)",
-                        data=csv,
+                        data=csv_bytes(export_data),
                         file_name=f"water_data_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv",
                         mime="text/csv"
                     )
@@ -462,137 +691,3 @@ def export_tab(tab, data):
                     file_name="demo_water_data.csv",
                     mime="text/csv"
                 )
-
-def generate_demo_data():
-    """Generate demo data for the dashboard when no real data is available."""
-    # Current time
-    now = datetime.now().timestamp()
-    
-    # Real-time data
-    real_time = {
-        'timestamp': now,
-        'flow_rate': 8.5,
-        'pressure': 3.2,
-        'volume': 0.5,
-        'hourly_usage': 22.8,
-        'daily_usage': 245.6
-    }
-    
-    # Historical data
-    dates = pd.date_range(start=datetime.now() - timedelta(days=7), end=datetime.now(), freq='1H')
-    timestamps = [d.timestamp() for d in dates]
-    
-    # Create patterns for flow rate and pressure
-    hour_of_day = [d.hour for d in dates]
-    
-    # Daily pattern multipliers
-    daily_pattern = {
-        0: 0.3,  # Midnight
-        1: 0.2,
-        2: 0.1,
-        3: 0.1,
-        4: 0.2,
-        5: 0.5,
-        6: 1.0,  # Morning peak
-        7: 1.5,
-        8: 1.2,
-        9: 0.8,
-        10: 0.7,
-        11: 0.8,
-        12: 1.0,  # Lunch time
-        13: 0.9,
-        14: 0.7,
-        15: 0.6,
-        16: 0.7,
-        17: 1.2,  # Evening peak
-        18: 1.8,
-        19: 1.5,
-        20: 1.2,
-        21: 0.9,
-        22: 0.6,
-        23: 0.4
-    }
-    
-    flow_rate = []
-    pressure = []
-    volume = []
-    hourly_usage = []
-    daily_usage = []
-    
-    # Generate data with realistic patterns
-    daily_sum = 0
-    hourly_sum = 0
-    last_day = dates[0].day
-    last_hour = dates[0].hour
-    
-    for i, (date, hour) in enumerate(zip(dates, hour_of_day)):
-        # Reset daily/hourly sums when day/hour changes
-        if date.day != last_day:
-            daily_sum = 0
-            last_day = date.day
-            
-        if date.hour != last_hour:
-            hourly_sum = 0
-            last_hour = date.hour
-        
-        # Base flow rate with pattern and random variations
-        base_flow = daily_pattern.get(hour, 0.5) * 8.0
-        flow = base_flow * (1 + np.random.normal(0, 0.1))
-        flow_rate.append(max(0, flow))
-        
-        # Base pressure with random variations
-        base_pressure = 3.5 + np.random.normal(0, 0.2)
-        pressure.append(max(0.5, base_pressure))
-        
-        # Volume calculation (flow rate * 60 minutes / 1000 to get liters)
-        vol = flow * 60 / 1000
-        volume.append(vol)
-        
-        # Update hourly and daily usage
-        hourly_sum += vol
-        daily_sum += vol
-        
-        hourly_usage.append(hourly_sum)
-        daily_usage.append(daily_sum)
-    
-    # Create DataFrame
-    historical = pd.DataFrame({
-        'timestamp': timestamps,
-        'flow_rate': flow_rate,
-        'pressure': pressure,
-        'volume': volume,
-        'hourly_usage': hourly_usage,
-        'daily_usage': daily_usage
-    })
-    
-    # Add some anomalies for demonstration
-    anomaly_indices = np.random.choice(len(historical), size=3, replace=False)
-    for idx in anomaly_indices:
-        if idx > 0:  # Skip the first entry
-            historical.loc[idx, 'flow_rate'] = historical.loc[idx, 'flow_rate'] * 3
-            historical.loc[idx, 'pressure'] = historical.loc[idx, 'pressure'] * 1.5
-    
-    # Alerts
-    alerts = [
-        {
-            'timestamp': now - 3600,  # 1 hour ago
-            'message': "Unusual water flow detected (20.5 L/min) at 14:30",
-            'severity': 'high'
-        },
-        {
-            'timestamp': now - 7200,  # 2 hours ago
-            'message': "Daily water usage exceeded threshold (510.2 L)",
-            'severity': 'medium'
-        },
-        {
-            'timestamp': now - 86400,  # 1 day ago
-            'message': "Sensor connection restored after 5 minutes offline",
-            'severity': 'info'
-        }
-    ]
-    
-    return {
-        'real_time': real_time,
-        'historical': historical,
-        'alerts': alerts
-    }
\ No newline at end of file
@@ -1,8 +1,32 @@
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from firebase_manager import FirebaseManager
 
+# Serve generated demo data instead of Firebase data (set SMARTWATER_DEMO=1)
+DEMO_MODE = os.getenv("SMARTWATER_DEMO") == "1"
+
+# Worker threads for concurrent Firebase requests
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="firebase-fetch")
+
+# Shared random generator for the demo data generators
+_rng = np.random.default_rng()
+
+# Demo flow multipliers indexed by hour of day
+_DAILY_PATTERN = np.array([
+    0.3,  # Midnight
+    0.2, 0.1, 0.1, 0.2, 0.5,
+    1.0,  # Morning peak
+    1.5, 1.2, 0.8, 0.7, 0.8,
+    1.0,  # Lunch time
+    0.9, 0.7, 0.6, 0.7,
+    1.2,  # Evening peak
+    1.8, 1.5, 1.2, 0.9, 0.6, 0.4
+], dtype=np.float32)
+_DAILY_PATTERN.setflags(write=False)
+
 def get_real_time_data(firebase_manager: FirebaseManager):
     """
     Get real-time data from the Firebase database.
@@ -15,7 +39,7 @@ def get_real_time_data(firebase_manager: FirebaseManager):
     """
     try:
         # In demo mode, generate random data
-        if 'demo_mode' in pd.Series.__dict__ and pd.Series.__dict__['demo_mode']:
+        if DEMO_MODE:
             return generate_demo_realtime_data()
         
         # Get latest readings from Firebase
@@ -24,13 +48,11 @@ def get_real_time_data(firebase_manager: FirebaseManager):
         if not latest_data:
             return None
         
-        # Get hourly and daily usage for context
-        hourly_usage = firebase_manager.get_hourly_usage()
-        daily_usage = firebase_manager.get_daily_usage()
-        
-        # Add usage to data
-        latest_data['hourly_usage'] = hourly_usage
-        latest_data['daily_usage'] = daily_usage
+        # Add usage to data; the hourly and daily usage are independent
+        # requests, so fetch them concurrently
+        hourly_future = _FETCH_EXECUTOR.submit(firebase_manager.get_hourly_usage)
+        latest_data['daily_usage'] = firebase_manager.get_daily_usage()
+        latest_data['hourly_usage'] = hourly_future.result()
         
         return latest_data
         
@@ -48,15 +70,15 @@ def get_historical_data(firebase_manager: FirebaseManager, start_date, end_date)
         end_date: End date for historical data
         
     Returns:
-        DataFrame: Pandas DataFrame containing historical data
+        DataFrame: Pandas DataFrame containing historical data, indexed by datetime
     """
     try:
         # In demo mode, generate random historical data
-        if 'demo_mode' in pd.Series.__dict__ and pd.Series.__dict__['demo_mode']:
+        if DEMO_MODE:
             return generate_demo_historical_data(start_date, end_date)
         
         # Get readings from Firebase for the specified date range
-        readings = firebase_manager.get_historical_readings(start_date, end_date)
+        readings = firebase_manager.get_historical_columns(start_date, end_date)
         
         if not readings:
             return pd.DataFrame()
@@ -64,9 +86,19 @@ def get_historical_data(firebase_manager: FirebaseManager, start_date, end_date)
         # Convert to DataFrame for easier manipulation
         df = pd.DataFrame(readings)
         
-        # Ensure timestamps are sorted
+        # Store sensor values as float32; that precision is plenty for display
+        for column in ('flow_rate', 'pressure', 'volume'):
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors='coerce', downcast='float')
+        
+        # Ensure timestamps are sorted and index by datetime once here,
+        # so views don't have to convert the timestamps on every render.
+        # FirebaseManager already returns readings in order, so the sort
+        # is only a fallback
         if 'timestamp' in df.columns:
-            df = df.sort_values('timestamp')
+            if not df['timestamp'].is_monotonic_increasing:
+                df = df.sort_values('timestamp')
+            df.index = pd.DatetimeIndex(pd.to_datetime(df['timestamp'], unit='s'), name='datetime')
         
         return df
         
@@ -89,19 +121,17 @@ def resample_data(df, frequency='1H'):
         if df.empty:
             return df
         
-        # Ensure DataFrame has a datetime index
-        if 'datetime' not in df.columns and not isinstance(df.index, pd.DatetimeIndex):
-            if 'timestamp' in df.columns:
-                df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-                df.set_index('datetime', inplace=True)
+        # Ensure DataFrame has a datetime index (without modifying the caller's frame)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            if 'datetime' in df.columns:
+                df = df.set_index('datetime')
+            elif 'timestamp' in df.columns:
+                df = df.set_index(pd.DatetimeIndex(pd.to_datetime(df['timestamp'], unit='s'), name='datetime'))
             else:
                 return df  # Can't resample without a datetime column
         
-        # Resample data
-        resampled = df.resample(frequency).mean()
-        
-        # Fill NaN values
-        resampled = resampled.fillna(method='ffill')
+        # Resample only the numeric columns and fill gaps forward
+        resampled = df.select_dtypes(include='number').resample(frequency).mean().ffill()
         
         return resampled
         
@@ -124,31 +154,79 @@ def detect_anomalies(df, column, window=20, threshold=3.0):
     """
     try:
         if df.empty or column not in df.columns:
-            return pd.Series(index=df.index)
-        
-        # Calculate rolling mean and standard deviation
-        rolling_mean = df[column].rolling(window=window, center=True).mean()
-        rolling_std = df[column].rolling(window=window, center=True).std()
-        
-        # Calculate z-scores
-        z_scores = (df[column] - rolling_mean) / rolling_std
+            return pd.Series(False, index=df.index, dtype=bool)
         
-        # Identify anomalies where z-score exceeds threshold
-        anomalies = abs(z_scores) > threshold
+        # Identify anomalies where the rolling z-score exceeds the threshold
+        anomalies = _rolling_zscore_mask(df[column].to_numpy(dtype=np.float64), window, threshold)
         
-        return anomalies
+        return pd.Series(anomalies, index=df.index)
         
     except Exception as e:
         print(f"Error detecting anomalies: {str(e)}")
-        return pd.Series(False, index=df.index)
+        return pd.Series(False, index=df.index, dtype=bool)
+
+def _rolling_zscore_mask(x, window, threshold):
+    """
+    Flag values whose centered rolling z-score exceeds a threshold.
+    
+    Matches pandas' rolling(window, center=True) mean/std (ddof=1), with windows
+    that are incomplete or contain NaN left unflagged, but computes every window
+    from prefix sums in a single pass instead of separate rolling passes.
+    
+    Args:
+        x: 1-D float64 array
+        window: Rolling window size
+        threshold: Z-score threshold
+        
+    Returns:
+        ndarray: Boolean anomaly mask with the same length as x
+    """
+    n = len(x)
+    mask = np.zeros(n, dtype=bool)
+    if window < 2 or n < window:
+        return mask
+    
+    # Center the data first so the sum-of-squares variance stays accurate
+    missing = np.isnan(x)
+    offset = x[~missing].mean() if not missing.all() else 0.0
+    centered = np.where(missing, 0.0, x - offset)
+    
+    # Window sums from prefix sums; window k covers x[k:k + window]
+    s = np.concatenate(([0.0], np.cumsum(centered)))
+    s2 = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    nans = np.concatenate(([0], np.cumsum(missing)))
+    window_sum = s[window:] - s[:-window]
+    window_sum2 = s2[window:] - s2[:-window]
+    window_nans = nans[window:] - nans[:-window]
+    
+    mean = window_sum / window
+    var = (window_sum2 - window_sum * mean) / (window - 1)
+    
+    # Prefix sums leave round-off that grows with their size, which swamps the
+    # variance of flat or nearly flat windows (e.g. forward-filled gaps), so
+    # recompute those few windows directly
+    suspect = np.flatnonzero(var <= 1e3 * np.finfo(np.float64).eps * s2[window:] / (window - 1))
+    if suspect.size:
+        windows = np.lib.stride_tricks.sliding_window_view(centered, window)[suspect]
+        mean[suspect] = windows.mean(axis=1)
+        var[suspect] = windows.var(axis=1, ddof=1)
+    
+    # Each window is labelled at its center, as pandas does with center=True
+    first = window - 1 - (window - 1) // 2
+    value = centered[first:first + len(mean)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (value - mean) / np.sqrt(var)
+    
+    mask[first:first + len(mean)] = (np.abs(z) > threshold) & (window_nans == 0)
+    return mask
 
 def generate_demo_realtime_data():
     """Generate demo real-time data for testing."""
     now = datetime.now().timestamp()
     
     # Random values for flow rate and pressure
-    flow_rate = 8.5 + np.random.normal(0, 1.0)
-    pressure = 3.2 + np.random.normal(0, 0.3)
+    flow_rate = 8.5 + _rng.normal(0, 1.0)
+    pressure = 3.2 + _rng.normal(0, 0.3)
     
     # Ensure positive values
     flow_rate = max(0.1, flow_rate)
@@ -160,12 +238,49 @@ def generate_demo_realtime_data():
         'flow_rate': round(flow_rate, 2),
         'pressure': round(pressure, 2),
         'volume': round(flow_rate * 60 / 1000, 2),  # L/min to L
-        'hourly_usage': round(22.8 + np.random.normal(0, 3.0), 2),
-        'daily_usage': round(245.6 + np.random.normal(0, 10.0), 2)
+        'hourly_usage': round(22.8 + _rng.normal(0, 3.0), 2),
+        'daily_usage': round(245.6 + _rng.normal(0, 10.0), 2)
     }
     
     return data
 
+def demo_hourly_series(hours, rng, volume_decimals=2):
+    """
+    Generate demo flow rate, pressure and volume for a series of hourly samples.
+    
+    Args:
+        hours: Integer array with the hour of day of each sample
+        rng: NumPy Generator to draw the noise from
+        volume_decimals: Decimal places to round the volume to
+        
+    Returns:
+        tuple: float32 arrays (flow_rate, pressure, volume)
+    """
+    n = len(hours)
+    
+    # Base flow rate with pattern and random variations, built in place in a
+    # single float32 buffer (float32 is plenty for demo sensor values)
+    flow = rng.standard_normal(n, dtype=np.float32)
+    flow *= 0.1
+    flow += 1
+    flow *= _DAILY_PATTERN[hours]
+    flow *= 8.0
+    
+    # Volume calculation (L/min over one minute, in liters), from the unclamped flow
+    volume = np.round(flow * 60 / 1000, volume_decimals)
+    
+    flow_rate = np.round(flow, 2, out=flow)
+    np.maximum(flow_rate, 0, out=flow_rate)
+    
+    # Base pressure with random variations
+    pressure = rng.standard_normal(n, dtype=np.float32)
+    pressure *= 0.2
+    pressure += 3.5
+    np.round(pressure, 2, out=pressure)
+    np.maximum(pressure, 0.5, out=pressure)
+    
+    return flow_rate, pressure, volume
+
 def generate_demo_historical_data(start_timestamp, end_timestamp):
     """Generate demo historical data for testing."""
     # Convert timestamps to datetime
@@ -174,80 +289,22 @@ def generate_demo_historical_data(start_timestamp, end_timestamp):
     
     # Generate a date range with hourly frequency
     dates = pd.date_range(start=start_date, end=end_date, freq='1H')
-    timestamps = [d.timestamp() for d in dates]
-    
-    # Generate flow rate with daily patterns
-    hour_of_day = [d.hour for d in dates]
+    n = len(dates)
+    timestamps = start_timestamp + np.arange(n) * 3600.0
     
-    # Daily pattern multipliers
-    daily_pattern = {
-        0: 0.3,  # Midnight
-        1: 0.2,
-        2: 0.1,
-        3: 0.1,
-        4: 0.2,
-        5: 0.5,
-        6: 1.0,  # Morning peak
-        7: 1.5,
-        8: 1.2,
-        9: 0.8,
-        10: 0.7,
-        11: 0.8,
-        12: 1.0,  # Lunch time
-        13: 0.9,
-        14: 0.7,
-        15: 0.6,
-        16: 0.7,
-        17: 1.2,  # Evening peak
-        18: 1.8,
-        19: 1.5,
-        20: 1.2,
-        21: 0.9,
-        22: 0.6,
-        23: 0.4
-    }
+    # Flow rate, pressure and volume following the daily pattern
+    flow_rate, pressure, volume = demo_hourly_series(dates.hour.to_numpy(), _rng)
     
-    # Generate data with patterns
-    flow_rate = []
-    pressure = []
-    volume = []
-    hourly_usage = []
-    daily_usage = []
+    # Hourly usage restarts every sample; daily usage is a running sum that
+    # restarts each day
+    hourly_usage = volume
+    daily_usage = pd.Series(volume).groupby(dates.normalize()).cumsum().round(2).to_numpy()
     
-    daily_sum = 0
-    hourly_sum = 0
-    last_day = dates[0].day
-    last_hour = dates[0].hour
-    
-    for i, (date, hour) in enumerate(zip(dates, hour_of_day)):
-        # Reset daily/hourly sums when day/hour changes
-        if date.day != last_day:
-            daily_sum = 0
-            last_day = date.day
-            
-        if date.hour != last_hour:
-            hourly_sum = 0
-            last_hour = date.hour
-        
-        # Base flow rate with pattern and random variations
-        base_flow = daily_pattern.get(hour, 0.5) * 8.0
-        flow = base_flow * (1 + np.random.normal(0, 0.1))
-        flow_rate.append(max(0, round(flow, 2)))
-        
-        # Base pressure with random variations
-        base_pressure = 3.5 + np.random.normal(0, 0.2)
-        pressure.append(max(0.5, round(base_pressure, 2)))
-        
-        # Volume calculation
-        vol = round(flow * 60 / 1000, 2)  # L/min to L
-        volume.append(vol)
-        
-        # Update hourly and daily usage
-        hourly_sum += vol
-        daily_sum += vol
-        
-        hourly_usage.append(round(hourly_sum, 2))
-        daily_usage.append(round(daily_sum, 2))
+    # Add some anomalies for demonstration (skipping the first entry); the
+    # arrays are scaled in place before the DataFrame is built
+    anomaly_indices = _rng.choice(np.arange(1, n), size=min(3, max(n - 1, 0)), replace=False)
+    flow_rate[anomaly_indices] *= 3
+    pressure[anomaly_indices] *= 1.5
     
     # Create DataFrame
     df = pd.DataFrame({
@@ -257,13 +314,6 @@ def generate_demo_historical_data(start_timestamp, end_timestamp):
         'volume': volume,
         'hourly_usage': hourly_usage,
         'daily_usage': daily_usage
-    })
-    
-    # Add some anomalies for demonstration
-    anomaly_indices = np.random.choice(len(df), size=3, replace=False)
-    for idx in anomaly_indices:
-        if idx > 0:  # Skip the first entry
-            df.loc[idx, 'flow_rate'] = df.loc[idx, 'flow_rate'] * 3
-            df.loc[idx, 'pressure'] = df.loc[idx, 'pressure'] * 1.5
+    }, copy=False)
     
     return df
\ No newline at end of file
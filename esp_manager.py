@@ -1,21 +1,71 @@
 import json
 import time
+import threading
+from functools import lru_cache
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from firebase_manager import FirebaseManager
+from data_processing import demo_hourly_series
+
+# Shared random generator for the demo data generators
+_rng = np.random.default_rng()
+
+# Realistic daily flow pattern, indexed by hour of day
+_DAILY_PATTERN = np.array([
+    0.3, 0.2, 0.1, 0.1, 0.2, 0.5,
+    1.0, 1.5, 1.2, 0.8, 0.7, 0.8,
+    1.0, 0.9, 0.7, 0.6, 0.7, 1.2,
+    1.8, 1.5, 1.2, 0.9, 0.6, 0.4
+], dtype=np.float32)
+_DAILY_PATTERN.setflags(write=False)
+
+# Seconds a Firebase response stays fresh in the ESPManager cache
+CACHE_TTL = {
+    "status": 30.0,
+    "reading": 2.0,
+}
+
+def _ar1(drive, coef, block=256):
+    """
+    Run the recurrence y[k] = coef * y[k-1] + drive[k] (with y[-1] = 0).
+    
+    Each block is solved in closed form, y = coef**k * cumsum(drive / coef**k),
+    carrying the last value into the next block; blocks keep coef**-k from
+    overflowing on long series.
+    
+    Args:
+        drive: 1-D float array of inputs
+        coef: Feedback coefficient, 0 < coef < 1
+        block: Samples solved per closed-form step
+    
+    Returns:
+        ndarray: The filtered series
+    """
+    out = np.empty(len(drive))
+    powers = coef ** np.arange(block)
+    last = 0.0
+    for start in range(0, len(drive), block):
+        chunk = drive[start:start + block]
+        p = powers[:len(chunk)]
+        out[start:start + len(chunk)] = p * (coef * last + np.cumsum(chunk / p))
+        last = out[start + len(chunk) - 1]
+    return out
 
 class ESPManager:
     """
     Manager class for handling ESP8266 device communication and data.
     """
     
-    def __init__(self, firebase_manager: FirebaseManager = None):
+    def __init__(self, firebase_manager: FirebaseManager = None, poll_interval=None):
         """
         Initialize the ESP Manager.
         
         Args:
             firebase_manager: Instance of FirebaseManager for database access
+            poll_interval: If set, refresh the default device's status and latest
+                reading in the background every this many seconds
         """
         self.firebase_manager = firebase_manager
         self.device_info = {}
@@ -27,6 +77,116 @@ class ESPManager:
             "ip_address": "",
             "firmware_version": "",
         }
+        
+        # Recent Firebase responses by (kind, device_id), plus requests in flight
+        self._cache = {}
+        self._inflight = {}
+        self._cache_lock = threading.Lock()
+        
+        # Background polling (see start_polling)
+        self._poll_stop = threading.Event()
+        self._poll_thread = None
+        
+        # Historical queries keyed on minute-quantized windows, cleared on writes
+        self._connection_history_cache = lru_cache(maxsize=64)(self._load_connection_history)
+        self._sensor_readings_cache = lru_cache(maxsize=64)(self._load_sensor_readings)
+        if poll_interval and firebase_manager:
+            self.start_polling(interval=poll_interval)
+    
+    def start_polling(self, device_id="default", interval=1.0):
+        """
+        Keep a device's status and latest reading cached from a background thread.
+        
+        While polling runs, get_device_status and get_latest_reading are served
+        from the cache and don't wait on Firebase.
+        
+        Args:
+            device_id: ID of the ESP device to poll
+            interval: Seconds between polls
+        """
+        if not self.firebase_manager or (self._poll_thread and self._poll_thread.is_alive()):
+            return
+        
+        self._poll_stop.clear()
+        self._poll_thread = threading.Thread(
+            target=self._poll_loop,
+            args=(device_id, interval),
+            name=f"esp-poll-{device_id}",
+            daemon=True
+        )
+        self._poll_thread.start()
+    
+    def stop_polling(self):
+        """Stop the background polling thread, if running."""
+        self._poll_stop.set()
+    
+    def _poll_loop(self, device_id, interval):
+        """Fetch the device status and latest reading until polling is stopped."""
+        sources = (
+            ("status", self.firebase_manager.get_device_status),
+            ("reading", self.firebase_manager.get_latest_reading),
+        )
+        
+        while not self._poll_stop.is_set():
+            for kind, fetch in sources:
+                try:
+                    value = fetch(device_id)
+                except Exception as e:
+                    print(f"Error polling device {kind}: {e}")
+                    continue
+                
+                if value:
+                    with self._cache_lock:
+                        self._cache[(kind, device_id)] = (time.monotonic(), value)
+            
+            self._poll_stop.wait(interval)
+    
+    def _cached_fetch(self, kind, device_id, fetch):
+        """
+        Fetch a value from Firebase at most once per TTL.
+        
+        Concurrent callers asking for the same value while a request is in
+        flight wait for that request instead of starting their own.
+        
+        Args:
+            kind: Cache category, a key of CACHE_TTL
+            device_id: ID of the ESP device
+            fetch: Function taking device_id that performs the Firebase read
+            
+        Returns:
+            The cached or freshly fetched value
+        """
+        key = (kind, device_id)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < CACHE_TTL[kind]:
+                return cached[1]
+            
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = Future()
+                owner = True
+            else:
+                owner = False
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            value = fetch(device_id)
+        except Exception as e:
+            with self._cache_lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        
+        with self._cache_lock:
+            # Empty responses aren't cached so the next call retries
+            if value:
+                self._cache[key] = (time.monotonic(), value)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
     
     def get_device_status(self, device_id="default"):
         """
@@ -41,7 +201,7 @@ class ESPManager:
         if self.firebase_manager:
             try:
                 # Get device info from Firebase
-                device_data = self.firebase_manager.get_device_status(device_id)
+                device_data = self._cached_fetch("status", device_id, self.firebase_manager.get_device_status)
                 if device_data:
                     self.device_info = device_data
                     
@@ -78,7 +238,7 @@ class ESPManager:
         if self.firebase_manager:
             try:
                 # Get latest reading from Firebase
-                latest_reading = self.firebase_manager.get_latest_reading(device_id)
+                latest_reading = self._cached_fetch("reading", device_id, self.firebase_manager.get_latest_reading)
                 if latest_reading:
                     self.last_reading = latest_reading
                     return self.last_reading
@@ -88,6 +248,50 @@ class ESPManager:
         # Return demo data if no Firebase connection or error
         return self.generate_demo_sensor_reading()
     
+    def _load_connection_history(self, device_id, hours, minute):
+        """
+        Fetch connection logs from Firebase as a DataFrame.
+        
+        Cached per (device_id, hours, minute) by _connection_history_cache;
+        minute only keys the cache so results refresh once a minute.
+        
+        Returns:
+            DataFrame: Connection logs, or None if there were none
+        """
+        connection_logs = self.firebase_manager.get_connection_logs(device_id, hours)
+        if connection_logs:
+            return pd.DataFrame(connection_logs)
+        return None
+    
+    def _load_sensor_readings(self, device_id, start_minute, end_minute):
+        """
+        Fetch sensor readings from Firebase as a DataFrame.
+        
+        Cached per (device_id, start_minute, end_minute) by _sensor_readings_cache.
+        
+        Returns:
+            DataFrame: Sensor readings, or None if there were none
+        """
+        readings = self.firebase_manager.get_historical_columns(
+            start_minute * 60,
+            end_minute * 60
+        )
+        if not readings:
+            return None
+        
+        # Store sensor values as float32
+        df = pd.DataFrame(readings)
+        for column in ('flow_rate', 'pressure', 'volume'):
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors='coerce', downcast='float')
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
+        return df
+    
+    def clear_history_cache(self):
+        """Drop cached connection history and sensor readings."""
+        self._connection_history_cache.cache_clear()
+        self._sensor_readings_cache.cache_clear()
+    
     def get_connection_history(self, device_id="default", hours=24):
         """
         Get WiFi connection history for an ESP8266 device.
@@ -101,12 +305,10 @@ class ESPManager:
         """
         if self.firebase_manager:
             try:
-                # Get connection logs from Firebase
-                connection_logs = self.firebase_manager.get_connection_logs(device_id, hours)
-                if connection_logs:
-                    # Process and return the real data
-                    df = pd.DataFrame(connection_logs)
-                    return df
+                # Get connection logs from Firebase, reusing this minute's result
+                df = self._connection_history_cache(device_id, hours, int(time.time()) // 60)
+                if df is not None:
+                    return df.copy()
             except Exception as e:
                 print(f"Error getting connection history: {e}")
         
@@ -132,17 +334,15 @@ class ESPManager:
             
         if self.firebase_manager:
             try:
-                # Get sensor readings from Firebase
-                readings = self.firebase_manager.get_historical_readings(
-                    start_time.timestamp(),
-                    end_time.timestamp()
+                # Get sensor readings from Firebase, with the window widened to whole
+                # minutes so repeated views of the same range hit the cache
+                df = self._sensor_readings_cache(
+                    device_id,
+                    int(start_time.timestamp()) // 60,
+                    int(end_time.timestamp()) // 60 + 1
                 )
-                
-                if readings:
-                    # Process and return the real data
-                    df = pd.DataFrame(readings)
-                    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-                    return df
+                if df is not None:
+                    return df.copy()
             except Exception as e:
                 print(f"Error getting sensor readings: {e}")
         
@@ -173,7 +373,10 @@ class ESPManager:
                     "status": "pending"
                 }
                 
-                return self.firebase_manager.send_device_command(device_id, command_data)
+                success = self.firebase_manager.send_device_command(device_id, command_data)
+                if success:
+                    self.clear_history_cache()
+                return success
             except Exception as e:
                 print(f"Error sending command: {e}")
                 return False
@@ -194,10 +397,13 @@ class ESPManager:
         """
         if self.firebase_manager:
             try:
-                return self.firebase_manager.save_sensor_calibration(
+                success = self.firebase_manager.save_sensor_calibration(
                     "default",  # Default user ID
                     calibration_data
                 )
+                if success:
+                    self.clear_history_cache()
+                return success
             except Exception as e:
                 print(f"Error updating calibration: {e}")
                 return False
@@ -209,13 +415,13 @@ class ESPManager:
     def generate_demo_device_status(self):
         """Generate demo device status data for testing."""
         now = datetime.now()
-        connected = np.random.choice([True, True, True, False], p=[0.8, 0.1, 0.05, 0.05])
-        last_seen = now if connected else now - timedelta(minutes=np.random.randint(5, 60))
+        connected = _rng.choice([True, True, True, False], p=[0.8, 0.1, 0.05, 0.05])
+        last_seen = now if connected else now - timedelta(minutes=int(_rng.integers(5, 60)))
         
         return {
             "connected": connected,
             "last_seen": last_seen,
-            "signal_strength": -65 + np.random.normal(0, 5),
+            "signal_strength": -65 + _rng.normal(0, 5),
             "ip_address": "192.168.1.25" if connected else "Unknown",
             "firmware_version": "1.0.3"
         }
@@ -225,20 +431,12 @@ class ESPManager:
         now = datetime.now()
         hour = now.hour
         
-        # Create a realistic daily pattern
-        hour_factor = {
-            0: 0.3, 1: 0.2, 2: 0.1, 3: 0.1, 4: 0.2, 5: 0.5,
-            6: 1.0, 7: 1.5, 8: 1.2, 9: 0.8, 10: 0.7, 11: 0.8,
-            12: 1.0, 13: 0.9, 14: 0.7, 15: 0.6, 16: 0.7, 17: 1.2,
-            18: 1.8, 19: 1.5, 20: 1.2, 21: 0.9, 22: 0.6, 23: 0.4
-        }
-        
         # Base flow with time-appropriate pattern
-        base_flow = hour_factor.get(hour, 0.5) * 8.0
-        flow_rate = max(0.1, base_flow * (1 + np.random.normal(0, 0.1)))
+        base_flow = float(_DAILY_PATTERN[hour]) * 8.0
+        flow_rate = max(0.1, base_flow * (1 + _rng.normal(0, 0.1)))
         
         # Base pressure with some random variation
-        pressure = max(0.5, 3.5 + np.random.normal(0, 0.2))
+        pressure = max(0.5, 3.5 + _rng.normal(0, 0.2))
         
         # Calculate some cumulative volumes
         hourly_usage = flow_rate * 60 / 1000  # L per minute * 60 min / 1000 to convert to cubic meters
@@ -251,44 +449,40 @@ class ESPManager:
             "hourly_usage": round(hourly_usage, 2),
             "daily_usage": round(daily_usage, 2),
             "total_volume": round(daily_usage * 30, 2),  # Simulate a month of usage
-            "battery": 85 + np.random.randint(-5, 5)  # Battery percentage
+            "battery": 85 + int(_rng.integers(-5, 5))  # Battery percentage
         }
     
     def generate_demo_connection_history(self, hours=24):
         """Generate demo connection history for testing."""
         now = datetime.now()
-        timestamps = [now - timedelta(hours=i) for i in range(hours, 0, -1)]
+        timestamps = now - pd.to_timedelta(np.arange(hours, 0, -1), unit='h')
         
-        # Random signal strengths with some correlation
-        base_signal = -65
-        signal_strengths = []
-        connected_values = []
+        # Draw all the randomness for the series up front
+        n = len(timestamps)
+        drift_noise = _rng.normal(0, 3, n)
+        signal_noise = _rng.normal(0, 3, n)
+        weak_draws = _rng.random(n)
+        drop_draws = _rng.random(n)
         
-        for i in range(len(timestamps)):
-            if i > 0:
-                # Add some correlation with previous value
-                base_signal = 0.9 * base_signal + 0.1 * (-65 + np.random.normal(0, 3))
-            
-            # Apply random variation
-            signal = base_signal + np.random.normal(0, 3)
-            signal = max(-100, min(-40, signal))
-            signal_strengths.append(signal)
-            
-            # Determine if connected
-            is_connected = True
-            if signal < -85:
-                # Very weak signal might mean disconnection
-                is_connected = np.random.choice([True, False], p=[0.3, 0.7])
-            
-            # Occasionally add random disconnections
-            if np.random.random() < 0.05:
-                is_connected = False
-                
-            connected_values.append(is_connected)
+        # Random signal strengths with some correlation: each hour's base
+        # signal is 0.9 * previous + 0.1 * (-65 + noise), starting at -65
+        drive = 0.1 * (-65 + drift_noise)
+        drive[:1] = -65
+        base_signal = _ar1(drive, 0.9)
+        
+        # Apply random variation and clip to the valid RSSI range in place
+        signal_strengths = base_signal
+        signal_strengths += signal_noise
+        np.clip(signal_strengths, -100, -40, out=signal_strengths)
+        
+        # Very weak signal might mean disconnection (30% chance of staying
+        # connected), and occasionally add random disconnections
+        weak_drop = (signal_strengths < -85) & (weak_draws >= 0.3)
+        connected_values = ~weak_drop & (drop_draws >= 0.05)
         
         return pd.DataFrame({
             'timestamp': timestamps,
-            'signal_strength': signal_strengths,
+            'signal_strength': signal_strengths.astype(np.float32),
             'connected': connected_values
         })
     
@@ -297,39 +491,13 @@ class ESPManager:
         # Create a date range with hourly samples
         date_range = pd.date_range(start=start_time, end=end_time, freq='1h')
         
-        # Create patterns for flow rate and pressure
-        hour_of_day = [d.hour for d in date_range]
+        n = len(date_range)
         
-        # Daily pattern multipliers
-        daily_pattern = {
-            0: 0.3, 1: 0.2, 2: 0.1, 3: 0.1, 4: 0.2, 5: 0.5,
-            6: 1.0, 7: 1.5, 8: 1.2, 9: 0.8, 10: 0.7, 11: 0.8,
-            12: 1.0, 13: 0.9, 14: 0.7, 15: 0.6, 16: 0.7, 17: 1.2,
-            18: 1.8, 19: 1.5, 20: 1.2, 21: 0.9, 22: 0.6, 23: 0.4
-        }
+        # Flow rate, pressure and volume following the daily pattern
+        flow_rates, pressures, volumes = demo_hourly_series(date_range.hour.to_numpy(), _rng, volume_decimals=3)
         
-        # Generate data
-        flow_rates = []
-        pressures = []
-        volumes = []
-        timestamps = []
-        
-        for date, hour in zip(date_range, hour_of_day):
-            # Base flow rate with pattern and random variations
-            base_flow = daily_pattern.get(hour, 0.5) * 8.0
-            flow = base_flow * (1 + np.random.normal(0, 0.1))
-            flow_rates.append(max(0, round(flow, 2)))
-            
-            # Base pressure with random variations
-            base_pressure = 3.5 + np.random.normal(0, 0.2)
-            pressures.append(max(0.5, round(base_pressure, 2)))
-            
-            # Volume calculation (flow rate * 60 minutes / 1000 to get liters)
-            vol = flow * 60 / 1000
-            volumes.append(round(vol, 3))
-            
-            # Unix timestamp
-            timestamps.append(int(date.timestamp()))
+        # Unix timestamps, one hour apart
+        timestamps = int(start_time.timestamp()) + np.arange(n) * 3600
         
         # Create DataFrame
         return pd.DataFrame({
@@ -338,4 +506,4 @@ class ESPManager:
             'flow_rate': flow_rates,
             'pressure': pressures,
             'volume': volumes
-        })
\ No newline at end of file
+        }, copy=False)
\ No newline at end of file
@@ -1,10 +1,144 @@
+import copy
 import json
+import logging
 import os
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 import uuid
+from secrets import token_hex
 import random
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+# Per-request diagnostics go here at DEBUG level instead of stdout
+_log = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds for Firebase REST calls
+REQUEST_TIMEOUT = (3, 10)
+
+# Seconds fetched historical readings are reused, and how many windows are kept
+HISTORY_CACHE_TTL = 60.0
+HISTORY_CACHE_SIZE = 64
+
+# Threads for probing candidate database paths concurrently
+_PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="firebase-probe")
+
+# Shared random generator for batched demo data, and bound draws for
+# single values
+_rng = np.random.default_rng()
+_rand = random.random
+_getrandbits = random.getrandbits
+
+# Demo hourly usage multipliers, indexed by hour of day
+_HOUR_FACTORS = (
+    0.2, 0.1, 0.1, 0.1, 0.2, 0.5,
+    1.2, 1.5, 1.2, 0.8, 0.7, 0.8,
+    1.0, 0.9, 0.7, 0.6, 0.7, 1.0,
+    1.5, 1.2, 1.0, 0.8, 0.5, 0.3
+)
+
+# Demo daily usage multipliers, indexed by weekday (Monday is 0)
+_DAY_FACTORS = (1.0, 0.9, 1.1, 1.0, 1.2, 1.5, 1.3)
+
+# Demo flow rate multipliers for sensor readings, indexed by hour of day:
+# a curve dipping at noon, with morning and evening peaks
+_HOUR_FACTOR_ARRAY = 0.5 + 0.5 * np.abs(12 - np.arange(24)) / 12
+_HOUR_FACTOR_ARRAY[6:10] = 1.5  # Morning peak
+_HOUR_FACTOR_ARRAY[17:21] = 1.8  # Evening peak
+_HOUR_FACTOR_ARRAY.setflags(write=False)
+
+# Demo flow rate multipliers for sensor readings, indexed by weekday (weekends are busier)
+_DAY_FACTOR_ARRAY = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.3, 1.3])
+_DAY_FACTOR_ARRAY.setflags(write=False)
+
+# Settings returned for the demo user, apart from created_at
+_DEFAULT_SETTINGS = MappingProxyType({
+    "email": "demo@example.com",
+    "alert_thresholds": {
+        "pressure_high": 6.0,
+        "pressure_low": 1.0,
+        "flow_high": 20.0,
+        "daily_usage_high": 500.0
+    },
+    "sensor_calibration": {
+        "flow_factor": 1.0,
+        "pressure_zero": 0.0,
+        "pressure_factor": 1.0
+    },
+    "notifications": {
+        "enable_email": True,
+        "email": "demo@example.com",
+        "preferences": {
+            "high_pressure": True,
+            "low_pressure": True,
+            "high_flow": True,
+            "usage_limit": True,
+            "offline": True
+        }
+    }
+})
+
+def _ts_key(entry):
+    """Sort key for readings and log entries; entries without a timestamp sort first."""
+    return entry.get('timestamp', 0)
+
+def _with_volume(reading):
+    """
+    Add total_volume in liters to a Firebase reading that reports total_ml.
+    
+    Args:
+        reading: Reading dict, updated in place
+        
+    Returns:
+        dict: The same reading
+    """
+    if 'total_ml' in reading:
+        reading['total_volume'] = reading['total_ml'] / 1000.0
+    return reading
+
+def _soa_to_aos(columns):
+    """
+    Turn a dict of equal-length arrays into a list of reading dicts.
+    
+    Args:
+        columns: Dict mapping field name to array
+        
+    Returns:
+        list: One dict per reading
+    """
+    names = list(columns)
+    return [
+        dict(zip(names, values))
+        for values in zip(*(columns[name].tolist() for name in names))
+    ]
+
+def _aos_to_soa(readings):
+    """
+    Turn a list of reading dicts into a dict of arrays, one per field.
+    
+    Numeric fields become float64 arrays with NaN where a reading lacks the
+    field; anything else becomes an object array.
+    
+    Args:
+        readings: List of reading dicts
+        
+    Returns:
+        dict: Field name to array, in reading order
+    """
+    names = dict.fromkeys(name for reading in readings for name in reading)
+    columns = {}
+    for name in names:
+        values = [reading.get(name, np.nan) for reading in readings]
+        try:
+            columns[name] = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            columns[name] = np.array(values, dtype=object)
+    return columns
 
 class FirebaseManager:
     """
@@ -20,7 +154,7 @@ class FirebaseManager:
             auth_domain: Firebase auth domain
             database_url: Firebase database URL
             storage_bucket: Firebase storage bucket
-            service_account_key: Firebase service account key (JSON string)
+            service_account_key: Firebase service account key (JSON string or parsed dict)
         """
         self.config = {
             "apiKey": api_key,
@@ -34,8 +168,120 @@ class FirebaseManager:
         
         # Flag for demo mode - use real data if we have all required credentials
         self.demo_mode = not all([database_url, self.database_secret])
+        
+        # One pooled, keep-alive session for every REST call, so repeated reads
+        # skip the TCP and TLS handshake
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        
+        # Database paths the readings were found at, so later calls skip the probing
+        self._known_latest_path = None
+        self._known_readings_path = None
+        
+        # Recent historical readings by minute-rounded (start, end) window
+        self._history_cache = {}
+        self._history_lock = threading.Lock()
+        
         print(f"Firebase Manager initialized in {'demo' if self.demo_mode else 'live'} mode")
     
+    def warmup(self):
+        """
+        Open the connection to Firebase ahead of the first real request.
+        
+        Issues a shallow read of the database root so DNS and the TLS
+        handshake are done before the user submits a form.
+        
+        Returns:
+            bool: True if Firebase answered the request
+        """
+        if self.demo_mode:
+            return True
+        
+        try:
+            response = self._get("", shallow="true")
+            return response.status_code == 200
+        except Exception as e:
+            print(f"Error warming up Firebase connection: {str(e)}")
+            return False
+    
+    def _get(self, path, **params):
+        """
+        GET a database path through the shared session.
+        
+        Args:
+            path: Database path, without the leading slash or .json suffix
+            **params: Extra query parameters
+            
+        Returns:
+            Response: The HTTP response
+        """
+        if self.database_secret:
+            params["auth"] = self.database_secret
+        
+        return self._session.get(
+            f"{self.config['databaseURL']}/{path}.json",
+            params=params,
+            timeout=REQUEST_TIMEOUT
+        )
+    
+    def _first_hit(self, paths, accept, **params):
+        """
+        Probe several database paths at once and return the first usable one.
+        
+        All GETs are issued concurrently, so the probe costs about one round
+        trip instead of one per path. Paths keep their priority order: a later
+        path is only used if every earlier one came back empty.
+        
+        Args:
+            paths: Candidate database paths, in order of preference
+            accept: Function taking the decoded JSON, True if it is usable
+            **params: Extra query parameters sent with every GET
+            
+        Returns:
+            tuple: (path, data) for the first usable path, or (None, None)
+        """
+        futures = [_PROBE_EXECUTOR.submit(self._get, path, **params) for path in paths]
+        
+        try:
+            for path, future in zip(paths, futures):
+                _log.debug("Trying to read from path: %s", path)
+                try:
+                    response = future.result()
+                    if response.status_code == 200:
+                        data = json.loads(response.content)
+                        if accept(data):
+                            _log.debug("Found data at path: %s", path)
+                            return path, data
+                except Exception as e:
+                    print(f"Error reading from path {path}: {str(e)}")
+        finally:
+            # Drop probes that haven't started once we have an answer
+            for future in futures:
+                future.cancel()
+        
+        return None, None
+    
+    @staticmethod
+    def _valid(email, *passwords, min_len=6):
+        """
+        Check demo credentials: an email containing '@' and long enough passwords.
+        
+        Args:
+            email: User email
+            *passwords: Passwords that must each be at least min_len characters
+            min_len: Minimum password length
+            
+        Returns:
+            bool: True if the credentials are acceptable
+        """
+        return '@' in email and all(len(password) >= min_len for password in passwords)
+    
     def login_user(self, email, password):
         """
         Mock authentication with email and password for demo mode.
@@ -49,13 +295,13 @@ class FirebaseManager:
         """
         # For demo mode, accept any valid-looking email/password
         if self.demo_mode:
-            if '@' in email and len(password) >= 6:
+            if self._valid(email, password):
                 return {
                     'localId': 'demo-user-id',
                     'email': email,
                     'displayName': email.split('@')[0],
-                    'idToken': f"demo-token-{uuid.uuid4()}",
-                    'refreshToken': f"demo-refresh-{uuid.uuid4()}",
+                    'idToken': f"demo-token-{token_hex(16)}",
+                    'refreshToken': f"demo-refresh-{token_hex(16)}",
                     'expiresIn': '3600'
                 }
             else:
@@ -78,14 +324,14 @@ class FirebaseManager:
         """
         # For demo mode, pretend to create a user
         if self.demo_mode:
-            if '@' in email and len(password) >= 6:
+            if self._valid(email, password):
                 user_id = f"demo-user-{uuid.uuid4()}"
                 return {
                     'localId': user_id,
                     'email': email,
                     'displayName': email.split('@')[0],
-                    'idToken': f"demo-token-{uuid.uuid4()}",
-                    'refreshToken': f"demo-refresh-{uuid.uuid4()}",
+                    'idToken': f"demo-token-{token_hex(16)}",
+                    'refreshToken': f"demo-refresh-{token_hex(16)}",
                     'expiresIn': '3600'
                 }
             else:
@@ -104,7 +350,7 @@ class FirebaseManager:
         """
         # For demo mode, pretend to send a reset email
         if self.demo_mode:
-            if '@' in email:
+            if self._valid(email):
                 print(f"[DEMO] Password reset email sent to {email}")
                 return True
             else:
@@ -125,7 +371,7 @@ class FirebaseManager:
         """
         # For demo mode, pretend to change password
         if self.demo_mode:
-            if '@' in email and len(current_password) >= 6 and len(new_password) >= 6:
+            if self._valid(email, current_password, new_password):
                 print(f"[DEMO] Password changed for {email}")
                 return True
             else:
@@ -144,12 +390,11 @@ class FirebaseManager:
         """
         # For demo mode, generate random readings
         if self.demo_mode:
-            now = datetime.now()
             return {
-                'timestamp': now.timestamp(),
-                'flow_rate': 8.5 + random.uniform(-1.0, 1.0),
-                'pressure': 3.2 + random.uniform(-0.3, 0.3),
-                'temperature': 21.5 + random.uniform(-0.5, 0.5)
+                'timestamp': time.time(),
+                'flow_rate': 8.5 + (2.0 * _rand() - 1.0),
+                'pressure': 3.2 + 0.3 * (2.0 * _rand() - 1.0),
+                'temperature': 21.5 + 0.5 * (2.0 * _rand() - 1.0)
             }
         
         print("Real Firebase readings not implemented")
@@ -167,23 +412,19 @@ class FirebaseManager:
             hour = datetime.now().hour
             
             # Simulate typical daily water usage pattern
-            hour_factors = {
-                0: 0.2, 1: 0.1, 2: 0.1, 3: 0.1, 4: 0.2, 5: 0.5,
-                6: 1.2, 7: 1.5, 8: 1.2, 9: 0.8, 10: 0.7, 11: 0.8,
-                12: 1.0, 13: 0.9, 14: 0.7, 15: 0.6, 16: 0.7, 17: 1.0,
-                18: 1.5, 19: 1.2, 20: 1.0, 21: 0.8, 22: 0.5, 23: 0.3
-            }
-            
             base_usage = 25.0  # Base hourly usage in liters
-            return base_usage * hour_factors.get(hour, 1.0) * random.uniform(0.8, 1.2)
+            return base_usage * _HOUR_FACTORS[hour] * (0.8 + 0.4 * _rand())
         
         try:
-            # Get the current hour timestamp range
-            now = datetime.now()
-            start_of_hour = datetime(now.year, now.month, now.day, now.hour).timestamp()
+            # Get the current hour timestamp range, aligned to local time
+            # (some UTC offsets are not whole hours); keeping tm_isdst picks
+            # the right one of the two hours repeated when DST ends
+            now_ts = time.time()
+            now = time.localtime(now_ts)
+            start_of_hour = time.mktime(now[:4] + (0, 0, now.tm_wday, now.tm_yday, now.tm_isdst))
             
             # Calculate usage by fetching readings in the current hour
-            return self._calculate_usage_for_period(start_of_hour, now.timestamp())
+            return self._calculate_usage_for_period(start_of_hour, now_ts)
         except Exception as e:
             print(f"Error getting hourly usage from Firebase: {str(e)}")
             return 0.0
@@ -201,18 +442,18 @@ class FirebaseManager:
             weekday = datetime.now().weekday()
             
             # Simulate different usage patterns on different days
-            day_factors = {0: 1.0, 1: 0.9, 2: 1.1, 3: 1.0, 4: 1.2, 5: 1.5, 6: 1.3}
-            
             base_usage = 240.0  # Base daily usage in liters
-            return base_usage * day_factors.get(weekday, 1.0) * random.uniform(0.9, 1.1)
+            return base_usage * _DAY_FACTORS[weekday] * (0.9 + 0.2 * _rand())
         
         try:
-            # Get the current day timestamp range
-            now = datetime.now()
-            start_of_day = datetime(now.year, now.month, now.day).timestamp()
+            # Get the current day timestamp range, from local midnight
+            # (which may have a different UTC offset than now)
+            now_ts = time.time()
+            now = time.localtime(now_ts)
+            start_of_day = time.mktime(now[:3] + (0, 0, 0, now.tm_wday, now.tm_yday, -1))
             
             # Calculate usage by fetching readings for the current day
-            return self._calculate_usage_for_period(start_of_day, now.timestamp())
+            return self._calculate_usage_for_period(start_of_day, now_ts)
         except Exception as e:
             print(f"Error getting daily usage from Firebase: {str(e)}")
             return 0.0
@@ -229,31 +470,84 @@ class FirebaseManager:
         Returns:
             float: Water usage in liters for the period
         """
-        # Fetch readings for the period
-        readings = self.get_historical_readings(start_timestamp, end_timestamp)
-        
-        if not readings:
-            return 0.0
-            
-        # Sort readings by timestamp to ensure correct ordering
-        readings.sort(key=lambda x: x.get('timestamp', 0))
+        # Fetch readings for the period, one array per field in timestamp order
+        columns = self.get_historical_columns(start_timestamp, end_timestamp)
+        volumes = columns.get('total_volume')
         
         # If we only have one reading, we can't calculate usage
-        if len(readings) < 2:
+        if volumes is None or len(volumes) < 2:
             return 0.0
             
-        # Calculate the difference between the first and last reading's total volume
-        first_reading = readings[0]
-        last_reading = readings[-1]
-        
-        first_volume = first_reading.get('total_volume', 0)
-        last_volume = last_reading.get('total_volume', 0)
+        # Calculate the difference between the first and last reading's total volume,
+        # counting a missing volume as 0
+        first_volume, last_volume = np.nan_to_num(volumes[[0, -1]]).tolist()
         
         # Calculate the difference (usage)
         usage = max(0, last_volume - first_volume)  # Ensure non-negative
         
         return usage
     
+    def get_historical_columns(self, start_timestamp, end_timestamp):
+        """
+        Get historical sensor readings as one array per field.
+        
+        Same readings as get_historical_readings, sorted by timestamp, but laid
+        out column-wise for code that works field by field.
+        
+        Args:
+            start_timestamp: Start timestamp
+            end_timestamp: End timestamp
+            
+        Returns:
+            dict: Field name to array, empty if there are no readings
+        """
+        # Demo readings are generated column-wise already
+        if self.demo_mode:
+            return self._demo_history_columns(start_timestamp, end_timestamp)
+        
+        readings = self.get_historical_readings(start_timestamp, end_timestamp)
+        return _aos_to_soa(readings) if readings else {}
+    
+    def _demo_history_columns(self, start_timestamp, end_timestamp):
+        """
+        Generate random historical readings for demo mode, one array per field.
+        
+        Args:
+            start_timestamp: Start timestamp
+            end_timestamp: End timestamp
+            
+        Returns:
+            dict: timestamp, flow_rate, pressure and temperature arrays
+        """
+        # Determine interval based on date range
+        if end_timestamp - start_timestamp >= 8 * 86400:
+            # Hourly readings for larger ranges
+            interval = 3600
+        else:
+            # More frequent readings for smaller ranges
+            interval = 900
+        
+        # All reading times at once, with local hour and weekday from the
+        # UTC offset at the start of the range
+        count = max(int((end_timestamp - start_timestamp) // interval) + 1, 0)
+        timestamps = start_timestamp + np.arange(count) * float(interval)
+        local_days, local_seconds = np.divmod(
+            timestamps + time.localtime(start_timestamp).tm_gmtoff, 86400
+        )
+        hours = (local_seconds // 3600).astype(np.intp)
+        weekdays = ((local_days + 3) % 7).astype(np.intp)  # The epoch fell on a Thursday
+        
+        # Flow rate varies by hour and day of week with some randomness
+        hour_factors = _HOUR_FACTOR_ARRAY[hours]
+        day_factors = _DAY_FACTOR_ARRAY[weekdays]
+        
+        return {
+            'timestamp': timestamps,
+            'flow_rate': 8.0 * hour_factors * day_factors * _rng.uniform(0.8, 1.2, count),
+            'pressure': 3.2 + _rng.uniform(-0.3, 0.3, count),
+            'temperature': 21.5 + _rng.uniform(-0.5, 0.5, count)
+        }
+    
     def get_historical_readings(self, start_timestamp, end_timestamp):
         """
         Get historical sensor readings for a specified time range from Firebase.
@@ -267,101 +561,82 @@ class FirebaseManager:
         """
         # For demo mode, generate random historical readings
         if self.demo_mode:
-            readings = []
-            start_time = datetime.fromtimestamp(start_timestamp)
-            end_time = datetime.fromtimestamp(end_timestamp)
-            
-            # Determine interval based on date range
-            delta = end_time - start_time
-            if delta.days > 7:
-                # Hourly readings for larger ranges
-                interval = timedelta(hours=1)
-            else:
-                # More frequent readings for smaller ranges
-                interval = timedelta(minutes=15)
-            
-            current = start_time
-            while current <= end_time:
-                # Generate reading with some pattern
-                hour = current.hour
-                
-                # Flow rate varies by hour with some randomness
-                hour_factor = 0.5 + 0.5 * abs(12 - hour) / 12
-                if hour >= 6 and hour <= 9:  # Morning peak
-                    hour_factor = 1.5
-                elif hour >= 17 and hour <= 20:  # Evening peak
-                    hour_factor = 1.8
-                
-                # Add some day-of-week variation
-                day_factor = 1.0
-                if current.weekday() >= 5:  # Weekend
-                    day_factor = 1.3
-                
-                flow_rate = 8.0 * hour_factor * day_factor * random.uniform(0.8, 1.2)
-                pressure = 3.2 + random.uniform(-0.3, 0.3)
-                
-                readings.append({
-                    'timestamp': current.timestamp(),
-                    'flow_rate': flow_rate,
-                    'pressure': pressure,
-                    'temperature': 21.5 + random.uniform(-0.5, 0.5)
-                })
-                
-                current += interval
-            
-            return readings
+            return _soa_to_aos(self._demo_history_columns(start_timestamp, end_timestamp))
+        
+        # Reuse readings fetched for the same window, rounded to whole minutes
+        key = (int(start_timestamp) // 60, int(end_timestamp) // 60)
+        with self._history_lock:
+            cached = self._history_cache.get(key)
+        if cached and time.monotonic() - cached[0] < HISTORY_CACHE_TTL:
+            # Hand out copies so callers can't modify the cached readings
+            return [dict(reading) for reading in cached[1]]
+        
+        readings = self._fetch_historical_readings(start_timestamp, end_timestamp)
+        
+        # Empty results aren't cached so the next call retries
+        if readings:
+            stored = [dict(reading) for reading in readings]
+            with self._history_lock:
+                if key not in self._history_cache and len(self._history_cache) >= HISTORY_CACHE_SIZE:
+                    # Drop the oldest entry
+                    self._history_cache.pop(next(iter(self._history_cache)))
+                self._history_cache[key] = (time.monotonic(), stored)
+        
+        return readings
+    
+    def _fetch_historical_readings(self, start_timestamp, end_timestamp):
+        """
+        Fetch historical sensor readings for a time range from Firebase.
         
+        Args:
+            start_timestamp: Start timestamp
+            end_timestamp: End timestamp
+            
+        Returns:
+            list: Readings sorted by timestamp, empty if none were found
+        """
         try:
-            # Try different possible paths for sensor readings
-            possible_paths = ['sensor_readings', 'readings', 'data']
+            # Filter by time range on the server
+            query = {
+                "orderBy": '"timestamp"',
+                "startAt": start_timestamp,
+                "endAt": end_timestamp
+            }
             readings = []
+            readings_data = None
             
-            for path in possible_paths:
-                try:
-                    # Construct the Firebase REST API URL
-                    url = f"{self.config['databaseURL']}/{path}.json"
-                    if self.database_secret:
-                        url += f"?auth={self.database_secret}"
-                        # Add query parameters to filter by time range
-                        url += f'&orderBy="timestamp"&startAt={start_timestamp}&endAt={end_timestamp}'
-                    
-                    print(f"Trying to get historical readings from path: {path}")
-                    
-                    # Make the API request
-                    response = requests.get(url)
-                    
-                    # If successful and has content
-                    if response.status_code == 200:
-                        readings_data = response.json()
-                        
-                        # If there's actual data here
-                        if readings_data and isinstance(readings_data, dict):
-                            print(f"Found historical readings at path: {path}")
-                            
-                            # Convert the dictionary to a list and collect readings
-                            path_readings = list(readings_data.values())
-                            readings.extend(path_readings)
-                            
-                            # Break after finding readings
-                            if readings:
-                                break
-                except Exception as e:
-                    print(f"Error reading from path {path}: {str(e)}")
-                    continue
+            # Query the path readings were found at before, if any; an empty
+            # window there is a valid answer, only a failed request re-probes
+            if self._known_readings_path:
+                response = self._get(self._known_readings_path, **query)
+                if response.status_code == 200:
+                    readings_data = json.loads(response.content) or {}
+                else:
+                    self._known_readings_path = None
+            
+            if readings_data is None:
+                # Try different possible paths for sensor readings
+                possible_paths = ['sensor_readings', 'readings', 'data']
+                path, readings_data = self._first_hit(
+                    possible_paths,
+                    lambda data: bool(data) and isinstance(data, dict),
+                    **query
+                )
+                self._known_readings_path = path
+            
+            if readings_data and isinstance(readings_data, dict):
+                # Convert the dictionary to a list of readings, converting
+                # total_ml to total_volume (in liters) on the way
+                readings = [_with_volume(reading) for reading in readings_data.values()]
             
             # If we found any readings, process them
             if readings:
                 # Sort by timestamp
-                readings.sort(key=lambda x: x.get("timestamp", 0))
-                
-                # Convert total_ml to total_volume (in liters) for each reading
-                for reading in readings:
-                    if 'total_ml' in reading:
-                        reading['total_volume'] = reading['total_ml'] / 1000.0
+                readings.sort(key=_ts_key)
                 
                 return readings
             else:
-                print("No historical readings found in any tested path.")
+                _log.debug("No historical readings found in any tested path.")
                 return []
             
         except Exception as e:
@@ -412,32 +687,10 @@ class FirebaseManager:
         """
         # For demo mode, return default settings
         if self.demo_mode:
-            return {
-                "email": "demo@example.com",
-                "created_at": (datetime.now() - timedelta(days=30)).timestamp(),
-                "alert_thresholds": {
-                    "pressure_high": 6.0,
-                    "pressure_low": 1.0,
-                    "flow_high": 20.0,
-                    "daily_usage_high": 500.0
-                },
-                "sensor_calibration": {
-                    "flow_factor": 1.0,
-                    "pressure_zero": 0.0,
-                    "pressure_factor": 1.0
-                },
-                "notifications": {
-                    "enable_email": True,
-                    "email": "demo@example.com",
-                    "preferences": {
-                        "high_pressure": True,
-                        "low_pressure": True,
-                        "high_flow": True,
-                        "usage_limit": True,
-                        "offline": True
-                    }
-                }
-            }
+            # Copy so callers can edit the result without touching the defaults
+            settings = copy.deepcopy(dict(_DEFAULT_SETTINGS))
+            settings["created_at"] = time.time() - 30 * 86400
+            return settings
         
         print("Real Firebase user settings not implemented")
         return None
@@ -454,6 +707,14 @@ class FirebaseManager:
         """
         # For demo mode, generate a simulated device status
         if self.demo_mode:
+            # Slice every random field out of one 64-bit draw
+            bits = _getrandbits(64)
+            battery_bits = bits >> 56
+            if (bits >> 48) & 0xFF < 26:  # Low battery about 10% of the time
+                battery_level = 10 + battery_bits % 21
+            else:
+                battery_level = 75 + battery_bits % 26
+            
             return {
                 "device_id": device_id or "demo-device-01",
                 "ip_address": "192.168.1.100",
@@ -461,11 +722,11 @@ class FirebaseManager:
                 "firmware_version": "1.0.5",
                 "connected": True,
                 "ssid": "Realme Narzo",
-                "signal_strength": random.randint(-85, -55),
-                "last_update": datetime.now().timestamp(),
-                "uptime": random.randint(1000, 50000),
-                "wifi_quality": random.randint(60, 95),
-                "battery_level": random.randint(75, 100) if random.random() > 0.1 else random.randint(10, 30)
+                "signal_strength": -85 + (bits & 0xFFFF) % 31,
+                "last_update": time.time(),
+                "uptime": 1000 + ((bits >> 16) & 0xFFFFFF) % 49001,
+                "wifi_quality": 60 + ((bits >> 40) & 0xFF) % 36,
+                "battery_level": battery_level
             }
         
         try:
@@ -477,9 +738,11 @@ class FirebaseManager:
             
             if latest_reading is None:
                 return None
+            
+            now_ts = int(time.time())
                 
             # Get the latest timestamp
-            last_update = latest_reading.get('timestamp', int(time.time()))
+            last_update = latest_reading.get('timestamp', now_ts)
             
             # Get the wifi info from the ESP32 firmware (SSID is hardcoded in the firmware)
             # The ESP32 code prints WiFi signal strength but doesn't store in Firebase directly
@@ -498,7 +761,7 @@ class FirebaseManager:
             }
             
             # Calculate time difference from now to last update
-            time_diff = int(time.time()) - last_update
+            time_diff = now_ts - last_update
             
             # If the last update was more than 2 minutes ago, device may be offline
             if time_diff > 120:  # 2 minutes threshold
@@ -526,85 +789,65 @@ class FirebaseManager:
             now = datetime.now()
             hour = now.hour
             
-            # Flow rate varies by hour with some randomness
-            hour_factor = 0.5 + 0.5 * abs(12 - hour) / 12
-            if hour >= 6 and hour <= 9:  # Morning peak
-                hour_factor = 1.5
-            elif hour >= 17 and hour <= 20:  # Evening peak
-                hour_factor = 1.8
-            
-            # Add some day-of-week variation
-            day_factor = 1.0
-            if now.weekday() >= 5:  # Weekend
-                day_factor = 1.3
+            # Flow rate varies by hour and day of week with some randomness
+            hour_factor = _HOUR_FACTOR_ARRAY[hour]
+            day_factor = _DAY_FACTOR_ARRAY[now.weekday()]
             
-            flow_rate = 8.0 * hour_factor * day_factor * random.uniform(0.8, 1.2)
-            pressure = 3.2 + random.uniform(-0.3, 0.3)
+            flow_rate = float(8.0 * hour_factor * day_factor * (0.8 + 0.4 * _rand()))
+            pressure = 3.2 + 0.3 * (2.0 * _rand() - 1.0)
             
             return {
                 "device_id": device_id or "demo-device-01",
                 "timestamp": now.timestamp(),
                 "flow_rate": flow_rate,
                 "pressure": pressure,
-                "temperature": 21.5 + random.uniform(-0.5, 0.5),
-                "total_volume": 1000.0 + random.uniform(0, 500.0)
+                "temperature": 21.5 + 0.5 * (2.0 * _rand() - 1.0),
+                "total_volume": 1000.0 + 500.0 * _rand()
             }
         
         try:
-            # First, check the root of the database to see what paths exist
-            root_url = f"{self.config['databaseURL']}/.json"
-            if self.database_secret:
-                root_url += f"?auth={self.database_secret}"
-                
-            root_response = requests.get(root_url)
-            
-            if root_response.status_code == 200:
-                root_data = root_response.json()
-                if not isinstance(root_data, dict):
-                    print(f"Root data is not a dictionary: {root_data}")
-                else:
-                    print(f"Available root paths in Firebase: {list(root_data.keys())}")
-                    
-                    # Check if we have sensor_readings path
-                    if 'sensor_readings' in root_data:
-                        print("sensor_readings path exists in Firebase!")
-                        
-                    # Check if we have latest_reading path
-                    if 'latest_reading' in root_data:
-                        print("latest_reading path exists in Firebase!")
-            else:
-                print(f"Failed to get root data from Firebase: {root_response.status_code}")
-            
-            # Try multiple paths for latest reading, in case the ESP firmware is using a different path
-            possible_paths = ['latest_reading', 'latest', 'current_reading', 'current']
             reading_data = None
             
-            for path in possible_paths:
-                url = f"{self.config['databaseURL']}/{path}.json"
-                if self.database_secret:
-                    url += f"?auth={self.database_secret}"
-                    
-                print(f"Trying to read from path: {path}")
-                response = requests.get(url)
-                
+            # Read the path the latest reading was found at before, if any
+            if self._known_latest_path:
+                response = self._get(self._known_latest_path)
                 if response.status_code == 200:
-                    data = response.json()
-                    if data is not None:
-                        print(f"Found data at path: {path}")
-                        reading_data = data
-                        break
+                    reading_data = json.loads(response.content)
+                if reading_data is None:
+                    self._known_latest_path = None
+            
+            if reading_data is None:
+                # Try multiple paths for latest reading, in case the ESP firmware is using a different path
+                possible_paths = ['latest_reading', 'latest', 'current_reading', 'current']
+                
+                # Check which paths exist; shallow=true returns only the top-level keys
+                root_response = self._get("", shallow="true")
+                
+                if root_response.status_code == 200:
+                    root_data = json.loads(root_response.content)
+                    if not isinstance(root_data, dict):
+                        print(f"Root data is not a dictionary: {root_data}")
+                    else:
+                        _log.debug("Available root paths in Firebase: %s", list(root_data))
+                        
+                        # Only probe the candidate paths that exist
+                        possible_paths = [path for path in possible_paths if path in root_data]
+                else:
+                    print(f"Failed to get root data from Firebase: {root_response.status_code}")
+                
+                path, reading_data = self._first_hit(possible_paths, lambda data: data is not None)
+                self._known_latest_path = path
             
             # If no data found in any of the paths
             if reading_data is None:
-                print("No data found in any of the expected paths.")
+                _log.debug("No data found in any of the expected paths.")
                 return None
             
             # Convert total_ml to total_volume (in liters)
-            if 'total_ml' in reading_data:
-                reading_data['total_volume'] = reading_data['total_ml'] / 1000.0
+            _with_volume(reading_data)
                 
-            # Print the data we found for debugging
-            print(f"Found reading data: {reading_data}")
+            # Log the data we found for debugging
+            _log.debug("Found reading data: %s", reading_data)
                 
             # Return the latest reading
             return reading_data
@@ -628,12 +871,12 @@ class FirebaseManager:
         # For demo mode, generate simulated connection logs
         if self.demo_mode:
             logs = []
-            now = datetime.now()
+            now_ts = time.time()
             
             # Simulate some connection events over the requested time period
             for i in range(random.randint(5, 15)):
                 # Random time within the requested period
-                event_time = now - timedelta(hours=random.uniform(0, hours))
+                event_time = now_ts - hours * 3600 * _rand()
                 
                 # Decide if this is a connect or disconnect event
                 event_type = random.choice(["connect", "disconnect"])
@@ -642,7 +885,7 @@ class FirebaseManager:
                 if event_type == "connect":
                     rssi = random.randint(-85, -55)
                     logs.append({
-                        "timestamp": event_time.timestamp(),
+                        "timestamp": event_time,
                         "event": "connect",
                         "ip_address": "192.168.1.100",
                         "ssid": "Realme Narzo",
@@ -652,32 +895,32 @@ class FirebaseManager:
                     })
                 else:
                     logs.append({
-                        "timestamp": event_time.timestamp(),
+                        "timestamp": event_time,
                         "event": "disconnect",
                         "connected": False,
                         "reason": random.choice(["timeout", "user_initiated", "wifi_lost", "power_cycle"])
                     })
             
             # Sort by timestamp
-            logs.sort(key=lambda x: x["timestamp"])
+            logs.sort(key=_ts_key)
             return logs
         
         try:
             # The ESP32 firmware doesn't explicitly record connection logs
             # We can infer connection status from sensor readings
             # Calculate the timestamp for 'hours' ago
-            start_time = (datetime.now() - timedelta(hours=hours)).timestamp()
-            end_time = datetime.now().timestamp()
+            now_ts = time.time()
+            start_time = now_ts - hours * 3600
             
             # Get historical readings for this time period
-            readings = self.get_historical_readings(start_time, end_time)
+            readings = self.get_historical_readings(start_time, now_ts)
             
             if not readings:
                 # No readings available
                 return []
                 
-            # Sort readings by timestamp
-            readings.sort(key=lambda x: x.get("timestamp", 0))
+            # Readings come back sorted by timestamp
+            times = [reading.get("timestamp", 0) for reading in readings]
             
             # Generate connection logs from reading timestamps
             # If there are gaps in readings larger than 2 minutes (120 seconds),
@@ -685,9 +928,8 @@ class FirebaseManager:
             logs = []
             
             # Always assume a connection at the first reading
-            first_reading = readings[0]
             logs.append({
-                "timestamp": first_reading.get("timestamp") - 1,  # Just before first reading
+                "timestamp": times[0] - 1,  # Just before first reading
                 "event": "connect",
                 "ip_address": "192.168.1.100",  # Approximate, ESP32 gets dynamic IP
                 "ssid": "Realme Narzo",
@@ -696,37 +938,37 @@ class FirebaseManager:
                 "quality": 70  # Reasonable WiFi quality
             })
             
-            # Check for gaps between readings
-            for i in range(1, len(readings)):
-                prev_time = readings[i-1].get("timestamp", 0)
-                curr_time = readings[i].get("timestamp", 0)
+            # Find gaps larger than 2 minutes between consecutive readings in one pass
+            gaps = np.flatnonzero(np.diff(np.asarray(times, dtype=np.float64)) > 120)
+            
+            # Assume a disconnection and reconnection at each gap
+            for i in gaps.tolist():
+                prev_time = times[i]
+                curr_time = times[i + 1]
                 
-                # If there's a gap larger than 2 minutes, assume disconnection and reconnection
-                if curr_time - prev_time > 120:  # 2 minutes in seconds
-                    # Disconnection event
-                    logs.append({
-                        "timestamp": prev_time + 60,  # 1 minute after last reading
-                        "event": "disconnect",
-                        "connected": False,
-                        "reason": "timeout"  # Assume timeout
-                    })
-                    
-                    # Reconnection event
-                    logs.append({
-                        "timestamp": curr_time - 1,  # Just before new reading
-                        "event": "connect",
-                        "ip_address": "192.168.1.100",
-                        "ssid": "Realme Narzo",
-                        "signal_strength": -65,
-                        "connected": True,
-                        "quality": 70
-                    })
+                # Disconnection event
+                logs.append({
+                    "timestamp": prev_time + 60,  # 1 minute after last reading
+                    "event": "disconnect",
+                    "connected": False,
+                    "reason": "timeout"  # Assume timeout
+                })
+                
+                # Reconnection event
+                logs.append({
+                    "timestamp": curr_time - 1,  # Just before new reading
+                    "event": "connect",
+                    "ip_address": "192.168.1.100",
+                    "ssid": "Realme Narzo",
+                    "signal_strength": -65,
+                    "connected": True,
+                    "quality": 70
+                })
             
             # Check if the most recent reading is more than 2 minutes old
-            last_reading = readings[-1]
-            last_time = last_reading.get("timestamp", 0)
+            last_time = times[-1]
             
-            if datetime.now().timestamp() - last_time > 120:
+            if now_ts - last_time > 120:
                 # Add disconnection event
                 logs.append({
                     "timestamp": last_time + 60,  # 1 minute after last reading
@@ -735,9 +977,7 @@ class FirebaseManager:
                     "reason": "timeout"
                 })
             
-            # Sort logs by timestamp
-            logs.sort(key=lambda x: x.get("timestamp", 0))
-            
+            # Logs were appended in timestamp order, so no sort is needed
             return logs
             
         except Exception as e:
@@ -1,345 +1,518 @@
 import streamlit as st
-from firebase_manager import FirebaseManager
+import copy
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING
 
-def display_settings(firebase_manager: FirebaseManager):
+if TYPE_CHECKING:
+    from firebase_manager import FirebaseManager
+
+# Threads that write settings to Firebase while the page carries on
+_SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="settings-save")
+
+# Bit for each alert type, for comparing all the preferences at once
+_PREF_BITS = MappingProxyType({
+    "high_pressure": 1,
+    "low_pressure": 2,
+    "high_flow": 4,
+    "usage_limit": 8,
+    "offline": 16
+})
+
+# Settings used for anything the user hasn't saved yet
+_DEFAULT_SETTINGS = MappingProxyType({
+    "alert_thresholds": MappingProxyType({
+        "pressure_high": 6.0,
+        "pressure_low": 1.0,
+        "flow_high": 20.0,
+        "daily_usage_high": 500.0
+    }),
+    "sensor_calibration": MappingProxyType({
+        "flow_factor": 1.0,
+        "pressure_zero": 0.0,
+        "pressure_factor": 1.0
+    }),
+    "notifications": MappingProxyType({
+        "enable_email": True,
+        "email": "",
+        "preferences": MappingProxyType({
+            "high_pressure": True,
+            "low_pressure": True,
+            "high_flow": True,
+            "usage_limit": True,
+            "offline": True
+        })
+    })
+})
+
+def _preferences_mask(preferences):
+    """Pack a dict of alert type flags into one integer."""
+    return sum(bit for name, bit in _PREF_BITS.items() if preferences.get(name))
+
+@dataclass
+class UserSettings:
+    """Values shown on the settings page, parsed once from the nested settings dict."""
+    pressure_high: float = 6.0
+    pressure_low: float = 1.0
+    flow_high: float = 20.0
+    daily_usage_high: float = 500.0
+    flow_factor: float = 1.0
+    pressure_zero: float = 0.0
+    pressure_factor: float = 1.0
+    enable_email: bool = True
+    email: str = ""
+    high_pressure: bool = True
+    low_pressure: bool = True
+    high_flow: bool = True
+    usage_limit: bool = True
+    offline: bool = True
+    
+    @property
+    def preferences_mask(self):
+        """The alert type flags packed as by _preferences_mask."""
+        return sum(bit for name, bit in _PREF_BITS.items() if getattr(self, name))
+    
+    @classmethod
+    def from_dict(cls, settings, default_email=""):
+        """
+        Build from the nested dict returned by get_user_settings.
+        
+        Args:
+            settings: Settings dict with alert_thresholds, sensor_calibration
+                and notifications sections; missing values use the defaults
+            default_email: Notification email if the settings don't have one
+            
+        Returns:
+            UserSettings: The parsed settings
+        """
+        # Fill in the defaults once, so every value below is a plain lookup
+        thresholds = {**_DEFAULT_SETTINGS['alert_thresholds'], **settings.get('alert_thresholds', {})}
+        calibration = {**_DEFAULT_SETTINGS['sensor_calibration'], **settings.get('sensor_calibration', {})}
+        notifications = {
+            **_DEFAULT_SETTINGS['notifications'],
+            'email': default_email,
+            **settings.get('notifications', {})
+        }
+        preferences = {**_DEFAULT_SETTINGS['notifications']['preferences'], **notifications['preferences']}
+        
+        return cls(
+            pressure_high=float(thresholds['pressure_high']),
+            pressure_low=float(thresholds['pressure_low']),
+            flow_high=float(thresholds['flow_high']),
+            daily_usage_high=float(thresholds['daily_usage_high']),
+            flow_factor=float(calibration['flow_factor']),
+            pressure_zero=float(calibration['pressure_zero']),
+            pressure_factor=float(calibration['pressure_factor']),
+            enable_email=notifications['enable_email'],
+            email=notifications['email'],
+            high_pressure=preferences['high_pressure'],
+            low_pressure=preferences['low_pressure'],
+            high_flow=preferences['high_flow'],
+            usage_limit=preferences['usage_limit'],
+            offline=preferences['offline']
+        )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_user_settings(_firebase_manager, user_id):
+    """
+    Fetch a user's settings, shared across sessions for five minutes.
+    
+    Saving settings clears the user's entry, so every page that reads
+    settings through here sees the new values.
+    """
+    return _firebase_manager.get_user_settings(user_id)
+
+def display_settings(firebase_manager: "FirebaseManager"):
     """
     Display and manage user settings for the water monitoring system.
     """
     st.title("⚙️ Water Monitoring Settings")
     
+    # Report on, and roll back if needed, a save started on an earlier run
+    _check_background_save(firebase_manager)
+    
     # Create tabs for different settings categories
     tabs = st.tabs(["Alert Thresholds", "Sensor Calibration", "Notifications"])
     
-    # Get current user settings
+    # Get current user settings, fetched once per session and user rather than on every rerun
     user_id = st.session_state.get('user_id')
     user_settings = None
     
     if user_id:
-        user_settings = firebase_manager.get_user_settings(user_id)
+        if 'user_settings' not in st.session_state or st.session_state.get('user_settings_uid') != user_id:
+            st.session_state.user_settings = load_user_settings(firebase_manager, user_id)
+            st.session_state.user_settings_uid = user_id
+            st.session_state.pop('parsed_settings', None)
+        user_settings = st.session_state.user_settings
     
-    # Default settings if none are found
-    if not user_settings:
-        user_settings = {
-            "alert_thresholds": {
-                "pressure_high": 6.0,
-                "pressure_low": 1.0,
-                "flow_high": 20.0,
-                "daily_usage_high": 500.0
-            },
-            "sensor_calibration": {
-                "flow_factor": 1.0,
-                "pressure_zero": 0.0,
-                "pressure_factor": 1.0
-            },
-            "notifications": {
-                "enable_email": True,
-                "email": st.session_state.get('user_email', ''),
-                "preferences": {
-                    "high_pressure": True,
-                    "low_pressure": True,
-                    "high_flow": True,
-                    "usage_limit": True,
-                    "offline": True
-                }
-            }
-        }
+    # Parse the settings for the widgets once, not on every rerun
+    if 'parsed_settings' not in st.session_state:
+        st.session_state.parsed_settings = UserSettings.from_dict(
+            user_settings or {}, st.session_state.get('user_email', '')
+        )
+    user_settings = st.session_state.parsed_settings
     
     # Alert Thresholds Tab
-    alert_thresholds_tab(tabs[0], firebase_manager, user_id, user_settings)
+    with tabs[0]:
+        alert_thresholds_tab(firebase_manager, user_id, user_settings)
     
     # Sensor Calibration Tab
-    sensor_calibration_tab(tabs[1], firebase_manager, user_id, user_settings)
+    with tabs[1]:
+        sensor_calibration_tab(firebase_manager, user_id, user_settings)
     
     # Notifications Tab
-    notifications_tab(tabs[2], firebase_manager, user_id, user_settings)
+    with tabs[2]:
+        notifications_tab(firebase_manager, user_id, user_settings)
+    
+    # Changes from all three tabs are written together in one request
+    pending = st.session_state.get('pending_settings_delta', {})
+    saving = 'settings_save' in st.session_state
+    if st.button("Save All Settings", type="primary", disabled=saving or not pending):
+        save_pending_settings(firebase_manager, user_id)
+    elif saving:
+        st.caption("Saving settings...")
+    elif pending:
+        st.caption("Unsaved changes: " + ", ".join(
+            key.replace('_', ' ').title() for key in pending
+        ))
 
-def alert_thresholds_tab(tab, firebase_manager, user_id, user_settings):
-    """Display and manage alert threshold settings."""
-    with tab:
-        st.subheader("Alert Threshold Settings")
-        st.write("Set thresholds for when alerts should be triggered.")
+def _remember_settings(updated_settings):
+    """Merge saved settings into the session's cached copy."""
+    cached = st.session_state.get('user_settings') or {}
+    cached.update(updated_settings)
+    st.session_state.user_settings = cached
+    st.session_state.pop('parsed_settings', None)
+
+def _stage_settings(updated_settings):
+    """Add a tab's changes to the settings waiting for Save All."""
+    pending = st.session_state.setdefault('pending_settings_delta', {})
+    pending.update(updated_settings)
+
+def _unchanged(user_settings, values):
+    """Check whether every form value already matches the current settings."""
+    return all(getattr(user_settings, key) == value for key, value in values.items())
+
+def save_pending_settings(firebase_manager, user_id):
+    """Write all staged settings changes with a single save_user_settings call."""
+    pending = st.session_state.get('pending_settings_delta', {})
+    if not pending:
+        return
+    
+    # Ignore a repeat click within a second of the last save
+    now = time.monotonic()
+    if now - st.session_state.get('last_save_ts', 0) < 1.0:
+        st.info("Save in progress…")
+        return
+    
+    # Skip writing exactly what the last save wrote
+    payload_hash = hash(json.dumps(pending, sort_keys=True))
+    if payload_hash == st.session_state.get('last_save_hash'):
+        st.session_state.pending_settings_delta = {}
+        st.info("No changes to save.")
+        return
+    
+    st.session_state.last_save_ts = now
+    st.session_state.last_save_hash = payload_hash
+    
+    # Demo mode
+    if 'demo_mode' in st.session_state and st.session_state.demo_mode:
+        # Other sessions should load the new settings, not the cached copy
+        load_user_settings.clear(firebase_manager, user_id)
+        _remember_settings(pending)
+        st.session_state.pending_settings_delta = {}
+        st.success("Settings saved successfully in demo mode!")
+        return
+    
+    # Save to Firebase in the background, showing the new settings right away;
+    # _check_background_save restores the old ones if the write fails
+    if user_id:
+        previous = copy.deepcopy(st.session_state.get('user_settings'))
+        future = _SAVE_EXECUTOR.submit(firebase_manager.save_user_settings, user_id, pending)
+        st.session_state.settings_save = (future, user_id, previous, pending)
         
-        # Get current thresholds
-        thresholds = user_settings.get('alert_thresholds', {})
+        _remember_settings(pending)
+        st.session_state.pending_settings_delta = {}
+        st.success("Settings saved successfully!")
+    else:
+        st.error("User not authenticated. Please log in again.")
+
+def _check_background_save(firebase_manager):
+    """Finish a background save once its write to Firebase is done."""
+    save = st.session_state.get('settings_save')
+    if not save or not save[0].done():
+        return
+    
+    future, user_id, previous, pending = save
+    del st.session_state.settings_save
+    
+    error = future.exception()
+    if not error:
+        # Other sessions should load the new settings, not the cached copy;
+        # clearing before the write landed could re-cache the old ones
+        load_user_settings.clear(firebase_manager, user_id)
+    else:
+        # Roll back to the settings from before the save and stage the changes again
+        st.session_state.user_settings = previous
+        st.session_state.pop('parsed_settings', None)
+        st.session_state.pop('last_save_hash', None)
+        _stage_settings({**pending, **st.session_state.get('pending_settings_delta', {})})
+        st.error(f"Error saving settings: {str(error)}")
+
+def alert_thresholds_tab(firebase_manager, user_id, user_settings):
+    """Display and manage alert threshold settings."""
+    st.subheader("Alert Threshold Settings")
+    st.write("Set thresholds for when alerts should be triggered.")
+    
+    with st.form("threshold_form"):
+        # Pressure thresholds
+        st.write("### Pressure Thresholds")
+        col1, col2 = st.columns(2)
         
-        with st.form("threshold_form"):
-            # Pressure thresholds
-            st.write("### Pressure Thresholds")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                pressure_high = st.number_input(
-                    "High Pressure Threshold (bar)",
-                    min_value=1.0,
-                    max_value=10.0,
-                    value=float(thresholds.get('pressure_high', 6.0)),
-                    step=0.1,
-                    help="Alert when pressure exceeds this value"
-                )
-            
-            with col2:
-                pressure_low = st.number_input(
-                    "Low Pressure Threshold (bar)",
-                    min_value=0.1,
-                    max_value=5.0,
-                    value=float(thresholds.get('pressure_low', 1.0)),
-                    step=0.1,
-                    help="Alert when pressure falls below this value"
-                )
-            
-            # Flow threshold
-            st.write("### Flow Threshold")
-            flow_high = st.number_input(
-                "High Flow Rate Threshold (L/min)",
+        with col1:
+            pressure_high = st.number_input(
+                "High Pressure Threshold (bar)",
                 min_value=1.0,
-                max_value=50.0,
-                value=float(thresholds.get('flow_high', 20.0)),
-                step=0.5,
-                help="Alert when flow rate exceeds this value"
+                max_value=10.0,
+                value=user_settings.pressure_high,
+                step=0.1,
+                help="Alert when pressure exceeds this value"
             )
-            
-            # Usage threshold
-            st.write("### Usage Threshold")
-            daily_usage_high = st.number_input(
-                "Daily Usage Threshold (L)",
-                min_value=50.0,
-                max_value=2000.0,
-                value=float(thresholds.get('daily_usage_high', 500.0)),
-                step=10.0,
-                help="Alert when daily water usage exceeds this value"
+        
+        with col2:
+            pressure_low = st.number_input(
+                "Low Pressure Threshold (bar)",
+                min_value=0.1,
+                max_value=5.0,
+                value=user_settings.pressure_low,
+                step=0.1,
+                help="Alert when pressure falls below this value"
             )
+        
+        # Flow threshold
+        st.write("### Flow Threshold")
+        flow_high = st.number_input(
+            "High Flow Rate Threshold (L/min)",
+            min_value=1.0,
+            max_value=50.0,
+            value=user_settings.flow_high,
+            step=0.5,
+            help="Alert when flow rate exceeds this value"
+        )
+        
+        # Usage threshold
+        st.write("### Usage Threshold")
+        daily_usage_high = st.number_input(
+            "Daily Usage Threshold (L)",
+            min_value=50.0,
+            max_value=2000.0,
+            value=user_settings.daily_usage_high,
+            step=10.0,
+            help="Alert when daily water usage exceeds this value"
+        )
+        
+        # Save button
+        save_button = st.form_submit_button("Save Thresholds")
+        
+        if save_button:
+            # Prepare updated thresholds
+            updated_thresholds = {
+                "alert_thresholds": {
+                    "pressure_high": pressure_high,
+                    "pressure_low": pressure_low,
+                    "flow_high": flow_high,
+                    "daily_usage_high": daily_usage_high
+                }
+            }
             
-            # Save button
-            save_button = st.form_submit_button("Save Thresholds")
+            # Nothing to save if the form still matches the current settings
+            if _unchanged(user_settings, updated_thresholds["alert_thresholds"]):
+                st.session_state.get('pending_settings_delta', {}).pop("alert_thresholds", None)
+                st.info("No changes to save.")
+                return
             
-            if save_button:
-                # Prepare updated thresholds
-                updated_thresholds = {
-                    "alert_thresholds": {
-                        "pressure_high": pressure_high,
-                        "pressure_low": pressure_low,
-                        "flow_high": flow_high,
-                        "daily_usage_high": daily_usage_high
-                    }
-                }
-                
-                # Demo mode
-                if 'demo_mode' in st.session_state and st.session_state.demo_mode:
-                    st.success("Alert thresholds saved successfully in demo mode!")
-                    # Update session state for demo
-                    if 'user_settings' not in st.session_state:
-                        st.session_state.user_settings = {}
-                    st.session_state.user_settings.update(updated_thresholds)
-                    return
-                
-                # Save to Firebase
-                if user_id:
-                    try:
-                        firebase_manager.save_user_settings(user_id, updated_thresholds)
-                        st.success("Alert thresholds saved successfully!")
-                    except Exception as e:
-                        st.error(f"Error saving thresholds: {str(e)}")
-                else:
-                    st.error("User not authenticated. Please log in again.")
+            # Stage for Save All
+            _stage_settings(updated_thresholds)
+            st.success("Alert thresholds updated. Click Save All Settings to store them.")
 
-def sensor_calibration_tab(tab, firebase_manager, user_id, user_settings):
+def sensor_calibration_tab(firebase_manager, user_id, user_settings):
     """Display and manage sensor calibration settings."""
-    with tab:
-        st.subheader("Sensor Calibration")
-        st.write("Adjust calibration factors for your water sensors.")
+    st.subheader("Sensor Calibration")
+    st.write("Adjust calibration factors for your water sensors.")
+    
+    with st.form("calibration_form"):
+        # Flow meter calibration
+        st.write("### Flow Meter Calibration")
+        flow_factor = st.number_input(
+            "Flow Factor",
+            min_value=0.5,
+            max_value=1.5,
+            value=user_settings.flow_factor,
+            step=0.01,
+            help="Multiplier to adjust flow rate readings"
+        )
         
-        # Get current calibration
-        calibration = user_settings.get('sensor_calibration', {})
+        # Pressure sensor calibration
+        st.write("### Pressure Sensor Calibration")
+        col1, col2 = st.columns(2)
         
-        with st.form("calibration_form"):
-            # Flow meter calibration
-            st.write("### Flow Meter Calibration")
-            flow_factor = st.number_input(
-                "Flow Factor",
+        with col1:
+            pressure_zero = st.number_input(
+                "Pressure Zero Offset",
+                min_value=-1.0,
+                max_value=1.0,
+                value=user_settings.pressure_zero,
+                step=0.01,
+                help="Zero offset adjustment for pressure readings"
+            )
+        
+        with col2:
+            pressure_factor = st.number_input(
+                "Pressure Factor",
                 min_value=0.5,
                 max_value=1.5,
-                value=float(calibration.get('flow_factor', 1.0)),
+                value=user_settings.pressure_factor,
                 step=0.01,
-                help="Multiplier to adjust flow rate readings"
+                help="Multiplier to adjust pressure readings"
             )
+        
+        # Calibration test
+        st.write("### Calibration Test")
+        st.info("To test calibration, apply the factors to a known reference value.")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            test_flow = st.number_input(
+                "Test Flow Rate (L/min)",
+                min_value=0.0,
+                max_value=30.0,
+                value=10.0,
+                step=0.5
+            )
+            st.write(f"Calibrated Flow: {test_flow * flow_factor:.2f} L/min")
+        
+        with col2:
+            test_pressure = st.number_input(
+                "Test Pressure (bar)",
+                min_value=0.0,
+                max_value=10.0,
+                value=3.0,
+                step=0.1
+            )
+            st.write(f"Calibrated Pressure: {test_pressure * pressure_factor + pressure_zero:.2f} bar")
+        
+        # Save button
+        save_button = st.form_submit_button("Save Calibration")
+        
+        if save_button:
+            # Prepare updated calibration
+            updated_calibration = {
+                "flow_factor": flow_factor,
+                "pressure_zero": pressure_zero,
+                "pressure_factor": pressure_factor
+            }
             
-            # Pressure sensor calibration
-            st.write("### Pressure Sensor Calibration")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                pressure_zero = st.number_input(
-                    "Pressure Zero Offset",
-                    min_value=-1.0,
-                    max_value=1.0,
-                    value=float(calibration.get('pressure_zero', 0.0)),
-                    step=0.01,
-                    help="Zero offset adjustment for pressure readings"
-                )
-            
-            with col2:
-                pressure_factor = st.number_input(
-                    "Pressure Factor",
-                    min_value=0.5,
-                    max_value=1.5,
-                    value=float(calibration.get('pressure_factor', 1.0)),
-                    step=0.01,
-                    help="Multiplier to adjust pressure readings"
-                )
-            
-            # Calibration test
-            st.write("### Calibration Test")
-            st.info("To test calibration, apply the factors to a known reference value.")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                test_flow = st.number_input(
-                    "Test Flow Rate (L/min)",
-                    min_value=0.0,
-                    max_value=30.0,
-                    value=10.0,
-                    step=0.5
-                )
-                st.write(f"Calibrated Flow: {test_flow * flow_factor:.2f} L/min")
-            
-            with col2:
-                test_pressure = st.number_input(
-                    "Test Pressure (bar)",
-                    min_value=0.0,
-                    max_value=10.0,
-                    value=3.0,
-                    step=0.1
-                )
-                st.write(f"Calibrated Pressure: {test_pressure * pressure_factor + pressure_zero:.2f} bar")
-            
-            # Save button
-            save_button = st.form_submit_button("Save Calibration")
+            # Nothing to save if the form still matches the current settings
+            if _unchanged(user_settings, updated_calibration):
+                st.session_state.get('pending_settings_delta', {}).pop("sensor_calibration", None)
+                st.info("No changes to save.")
+                return
             
-            if save_button:
-                # Prepare updated calibration
-                updated_calibration = {
-                    "flow_factor": flow_factor,
-                    "pressure_zero": pressure_zero,
-                    "pressure_factor": pressure_factor
-                }
-                
-                # Demo mode
-                if 'demo_mode' in st.session_state and st.session_state.demo_mode:
-                    st.success("Sensor calibration saved successfully in demo mode!")
-                    # Update session state for demo
-                    if 'user_settings' not in st.session_state:
-                        st.session_state.user_settings = {}
-                    if 'sensor_calibration' not in st.session_state.user_settings:
-                        st.session_state.user_settings['sensor_calibration'] = {}
-                    st.session_state.user_settings['sensor_calibration'].update(updated_calibration)
-                    return
-                
-                # Save to Firebase
-                if user_id:
-                    try:
-                        firebase_manager.save_sensor_calibration(user_id, updated_calibration)
-                        st.success("Sensor calibration saved successfully!")
-                    except Exception as e:
-                        st.error(f"Error saving calibration: {str(e)}")
-                else:
-                    st.error("User not authenticated. Please log in again.")
+            # Stage for Save All
+            _stage_settings({"sensor_calibration": updated_calibration})
+            st.success("Sensor calibration updated. Click Save All Settings to store it.")
 
-def notifications_tab(tab, firebase_manager, user_id, user_settings):
+def notifications_tab(firebase_manager, user_id, user_settings):
     """Display and manage notification settings."""
-    with tab:
-        st.subheader("Notification Settings")
-        st.write("Configure how and when you receive alerts about your water system.")
+    st.subheader("Notification Settings")
+    st.write("Configure how and when you receive alerts about your water system.")
+    
+    with st.form("notification_form"):
+        # Email notifications
+        st.write("### Email Notifications")
+        enable_email = st.checkbox(
+            "Enable Email Notifications",
+            value=user_settings.enable_email
+        )
+        
+        # Email address
+        email = st.text_input(
+            "Email Address",
+            value=user_settings.email,
+            disabled=not enable_email
+        )
         
-        # Get current notification settings
-        notifications = user_settings.get('notifications', {})
-        preferences = notifications.get('preferences', {})
+        # Notification preferences
+        st.write("### Alert Types")
+        col1, col2 = st.columns(2)
         
-        with st.form("notification_form"):
-            # Email notifications
-            st.write("### Email Notifications")
-            enable_email = st.checkbox(
-                "Enable Email Notifications",
-                value=notifications.get('enable_email', True)
+        with col1:
+            high_pressure = st.checkbox(
+                "High Pressure Alerts",
+                value=user_settings.high_pressure,
+                disabled=not enable_email
             )
             
-            # Email address
-            email = st.text_input(
-                "Email Address",
-                value=notifications.get('email', st.session_state.get('user_email', '')),
+            low_pressure = st.checkbox(
+                "Low Pressure Alerts",
+                value=user_settings.low_pressure,
                 disabled=not enable_email
             )
             
-            # Notification preferences
-            st.write("### Alert Types")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                high_pressure = st.checkbox(
-                    "High Pressure Alerts",
-                    value=preferences.get('high_pressure', True),
-                    disabled=not enable_email
-                )
-                
-                low_pressure = st.checkbox(
-                    "Low Pressure Alerts",
-                    value=preferences.get('low_pressure', True),
-                    disabled=not enable_email
-                )
-                
-                high_flow = st.checkbox(
-                    "High Flow Alerts",
-                    value=preferences.get('high_flow', True),
-                    disabled=not enable_email
-                )
+            high_flow = st.checkbox(
+                "High Flow Alerts",
+                value=user_settings.high_flow,
+                disabled=not enable_email
+            )
+        
+        with col2:
+            usage_limit = st.checkbox(
+                "Usage Limit Alerts",
+                value=user_settings.usage_limit,
+                disabled=not enable_email
+            )
             
-            with col2:
-                usage_limit = st.checkbox(
-                    "Usage Limit Alerts",
-                    value=preferences.get('usage_limit', True),
-                    disabled=not enable_email
-                )
-                
-                offline = st.checkbox(
-                    "Offline Sensor Alerts",
-                    value=preferences.get('offline', True),
-                    disabled=not enable_email
-                )
+            offline = st.checkbox(
+                "Offline Sensor Alerts",
+                value=user_settings.offline,
+                disabled=not enable_email
+            )
+        
+        # Save button
+        save_button = st.form_submit_button("Save Notification Settings")
+        
+        if save_button:
+            # Prepare updated notification settings; the preferences dict is
+            # what gets stored, and the mask is only used for the comparison
+            preferences = {
+                "high_pressure": high_pressure,
+                "low_pressure": low_pressure,
+                "high_flow": high_flow,
+                "usage_limit": usage_limit,
+                "offline": offline
+            }
+            preferences_mask = _preferences_mask(preferences)
+            updated_notifications = {
+                "notifications": {
+                    "enable_email": enable_email,
+                    "email": email,
+                    "preferences": preferences
+                }
+            }
             
-            # Save button
-            save_button = st.form_submit_button("Save Notification Settings")
+            # Nothing to save if the form still matches the current settings
+            if _unchanged(user_settings, {
+                "enable_email": enable_email,
+                "email": email,
+                "preferences_mask": preferences_mask
+            }):
+                st.session_state.get('pending_settings_delta', {}).pop("notifications", None)
+                st.info("No changes to save.")
+                return
             
-            if save_button:
-                # Prepare updated notification settings
-                updated_notifications = {
-                    "notifications": {
-                        "enable_email": enable_email,
-                        "email": email,
-                        "preferences": {
-                            "high_pressure": high_pressure,
-                            "low_pressure": low_pressure,
-                            "high_flow": high_flow,
-                            "usage_limit": usage_limit,
-                            "offline": offline
-                        }
-                    }
-                }
-                
-                # Demo mode
-                if 'demo_mode' in st.session_state and st.session_state.demo_mode:
-                    st.success("Notification settings saved successfully in demo mode!")
-                    # Update session state for demo
-                    if 'user_settings' not in st.session_state:
-                        st.session_state.user_settings = {}
-                    st.session_state.user_settings.update(updated_notifications)
-                    return
-                
-                # Save to Firebase
-                if user_id:
-                    try:
-                        firebase_manager.save_user_settings(user_id, updated_notifications)
-                        st.success("Notification settings saved successfully!")
-                    except Exception as e:
-                        st.error(f"Error saving notification settings: {str(e)}")
-                else:
-                    st.error("User not authenticated. Please log in again.")
\ No newline at end of file
+            # Stage for Save All
+            _stage_settings(updated_notifications)
+            st.success("Notification settings updated. Click Save All Settings to store them.")
\ No newline at end of file
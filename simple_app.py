@@ -4,7 +4,9 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from dateutil import tz
 import os
+import time
 from firebase_manager import FirebaseManager
 from dotenv import load_dotenv
 
@@ -27,6 +29,22 @@ if 'current_page' not in st.session_state:
 if 'firebase_initialized' not in st.session_state:
     st.session_state.firebase_initialized = False
 
+@st.cache_resource(show_spinner=False)
+def _shared_firebase_manager(api_key=None, auth_domain=None, database_url=None, storage_bucket=None):
+    """
+    Create the FirebaseManager shared by every session in this process.
+    
+    Streamlit caches it per set of credentials, so its HTTP connection pool
+    and caches are reused instead of rebuilt for each new session.
+    """
+    return FirebaseManager(
+        api_key=api_key,
+        auth_domain=auth_domain,
+        database_url=database_url,
+        storage_bucket=storage_bucket,
+        service_account_key=None  # No service account for this simplified version
+    )
+
 # Initialize Firebase
 def init_firebase():
     """Initialize Firebase with credentials from environment variables."""
@@ -45,19 +63,18 @@ def init_firebase():
     if not database_url or not database_secret:
         st.warning("⚠️ Running in demo mode with simulated data. Firebase credentials not found.")
         st.session_state.demo_mode = True
-        firebase_manager = FirebaseManager()  # Initialize with demo mode defaults
+        firebase_manager = _shared_firebase_manager()  # Initialize with demo mode defaults
         st.session_state.firebase_manager = firebase_manager
         st.session_state.firebase_initialized = True
         return firebase_manager
     
     # We have the required credentials
     # Initialize Firebase manager with real credentials
-    firebase_manager = FirebaseManager(
+    firebase_manager = _shared_firebase_manager(
         api_key=api_key,
         auth_domain=auth_domain,
         database_url=database_url,
-        storage_bucket=storage_bucket,
-        service_account_key=None  # No service account for this simplified version
+        storage_bucket=storage_bucket
     )
     
     # Verify if Firebase is connected
@@ -108,6 +125,56 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Daily pattern multipliers by hour (simulate higher usage in morning and evening)
+_DAILY_PATTERN = np.array([
+    0.3, 0.2, 0.1, 0.1, 0.2, 0.5,  # Midnight to 5:00
+    1.0, 1.5, 1.2, 0.8, 0.7, 0.8,  # Morning peak at 7:00
+    1.0, 0.9, 0.7, 0.6, 0.7, 1.2,  # Lunch time at 12:00
+    1.8, 1.5, 1.2, 0.9, 0.6, 0.4   # Evening peak at 18:00
+])
+_DAILY_PATTERN.flags.writeable = False
+
+# Local timezone, with its DST rules, for converting reading timestamps
+_LOCAL_TZ = tz.tzlocal()
+
+# Title and gauge settings for the dashboard gauges
+_GAUGES = {
+    'flow_rate': {
+        'title': {'text': "Flow Rate (L/min)"},
+        'gauge': {
+            'axis': {'range': [0, 30], 'tickwidth': 1},
+            'bar': {'color': "#1f77b4"},
+            'steps': [
+                {'range': [0, 5], 'color': "lightblue"},
+                {'range': [5, 15], 'color': "royalblue"},
+                {'range': [15, 30], 'color': "darkblue"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 25
+            }
+        }
+    },
+    'pressure': {
+        'title': {'text': "Pressure (bar)"},
+        'gauge': {
+            'axis': {'range': [0, 10], 'tickwidth': 1},
+            'bar': {'color': "#ff7f0e"},
+            'steps': [
+                {'range': [0, 2], 'color': "lightyellow"},
+                {'range': [2, 6], 'color': "gold"},
+                {'range': [6, 10], 'color': "orange"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 8
+            }
+        }
+    }
+}
+
 def format_volume(volume, unit='L'):
     """Format volume with appropriate units."""
     if volume is None:
@@ -125,16 +192,34 @@ def format_volume(volume, unit='L'):
     
     return f"{volume:.1f} {unit}"
 
-def generate_demo_data():
-    """Generate demo data for display purposes."""
+def demo_seed():
+    """Return a seed for generate_demo_data that changes once a minute."""
+    return int(time.time() // 60)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def generate_demo_data(seed=0):
+    """
+    Generate demo data for display purposes.
+    
+    The result is cached, so reruns with the same seed reuse it instead of
+    regenerating the week of samples and summaries.
+    
+    Args:
+        seed: Seed for the random values, e.g. from demo_seed()
+        
+    Returns:
+        dict: Current reading, hourly history and summaries
+    """
+    rng = np.random.default_rng(seed)
+    
     # Current time
     now = datetime.now()
     
     # Real-time measurement data
     current_data = {
         'timestamp': now,
-        'flow_rate': 8.5 + np.random.normal(0, 1.0),
-        'pressure': 3.2 + np.random.normal(0, 0.3),
+        'flow_rate': 8.5 + rng.normal(0, 1.0),
+        'pressure': 3.2 + rng.normal(0, 0.3),
         'hourly_usage': 22.8,
         'daily_usage': 245.6,
         'weekly_usage': 1678.4
@@ -147,62 +232,23 @@ def generate_demo_data():
     # Historical data for charts
     dates = pd.date_range(start=now - timedelta(days=7), end=now, freq='1h')
     
-    # Generate patterns for flow rate and pressure
-    hour_of_day = [d.hour for d in dates]
+    # Daily pattern multiplier for each sample's hour of day
+    pattern = _DAILY_PATTERN[dates.hour.to_numpy()]
+    n = len(dates)
     
-    # Daily pattern multipliers (simulate higher usage in morning and evening)
-    daily_pattern = {
-        0: 0.3,  # Midnight
-        1: 0.2,
-        2: 0.1,
-        3: 0.1,
-        4: 0.2,
-        5: 0.5,
-        6: 1.0,  # Morning peak
-        7: 1.5,
-        8: 1.2,
-        9: 0.8,
-        10: 0.7,
-        11: 0.8,
-        12: 1.0,  # Lunch time
-        13: 0.9,
-        14: 0.7,
-        15: 0.6,
-        16: 0.7,
-        17: 1.2,  # Evening peak
-        18: 1.8,
-        19: 1.5,
-        20: 1.2,
-        21: 0.9,
-        22: 0.6,
-        23: 0.4
-    }
+    # Base flow rate with pattern and random variations
+    flow = pattern * 8.0 * (1 + rng.normal(0, 0.1, n))
     
-    # Generate flow and pressure data with patterns
-    flow_rate = []
-    pressure = []
-    volume = []
-    
-    for date, hour in zip(dates, hour_of_day):
-        # Base flow rate with pattern and random variations
-        base_flow = daily_pattern.get(hour, 0.5) * 8.0
-        flow = base_flow * (1 + np.random.normal(0, 0.1))
-        flow_rate.append(max(0, round(flow, 2)))
-        
-        # Base pressure with random variations
-        base_pressure = 3.5 + np.random.normal(0, 0.2)
-        pressure.append(max(0.5, round(base_pressure, 2)))
-        
-        # Volume calculation (flow rate * 60 minutes / 1000 to get liters)
-        vol = flow * 60 / 1000
-        volume.append(round(vol, 2))
+    # Base pressure with random variations
+    pressure = 3.5 + rng.normal(0, 0.2, n)
     
     # Create DataFrame
     historical = pd.DataFrame({
         'timestamp': dates,
-        'flow_rate': flow_rate,
-        'pressure': pressure,
-        'volume': volume
+        'flow_rate': np.maximum(0, flow.round(2)),
+        'pressure': np.maximum(0.5, pressure.round(2)),
+        # Volume calculation (flow rate * 60 minutes / 1000 to get liters)
+        'volume': (flow * 60 / 1000).round(2)
     })
     
     # Aggregate data by day/hour/week for summary stats
@@ -220,6 +266,82 @@ def generate_demo_data():
         'daily_summary': daily_data
     }
 
+def gauge_figure(name, value):
+    """
+    Return the gauge figure for name, showing value.
+    
+    Each session builds a gauge once and only updates its value on later
+    reruns. Figures are kept per session because reruns of different
+    sessions run in parallel.
+    
+    Args:
+        name: Key in _GAUGES
+        value: Value to show
+        
+    Returns:
+        Figure: The gauge figure
+    """
+    figures = st.session_state.setdefault('gauge_figures', {})
+    fig = figures.get(name)
+    if fig is None:
+        fig = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=value,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            **_GAUGES[name]
+        ))
+        fig.update_layout(height=250)
+        figures[name] = fig
+    else:
+        fig.data[0].value = value
+    return fig
+
+def readings_to_frame(readings):
+    """
+    Build a history DataFrame from Firebase readings in one pass.
+    
+    Args:
+        readings: List of reading dicts
+        
+    Returns:
+        DataFrame: timestamp, flow_rate, pressure and volume columns
+    """
+    df = pd.DataFrame.from_records(readings, columns=['timestamp', 'flow_rate', 'pressure']).fillna(0)
+    
+    # Local times, matching datetime.fromtimestamp
+    df['timestamp'] = (
+        pd.to_datetime(df['timestamp'], unit='s', utc=True)
+        .dt.tz_convert(_LOCAL_TZ)
+        .dt.tz_localize(None)
+    )
+    
+    # Estimate volume (flow rate * 60 seconds / 1000 to get liters), assuming readings every minute
+    df['volume'] = df['flow_rate'].astype('float32') * 0.06
+    return df
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_historical_readings(_firebase_manager, start_minute, end_minute):
+    """Fetch readings for a range of whole minutes, shared across reruns for 30 seconds."""
+    return _firebase_manager.get_historical_readings(start_minute * 60, end_minute * 60)
+
+def get_historical_readings(start_timestamp, end_timestamp):
+    """
+    Get historical readings from Firebase, cached between reruns.
+    
+    The range is widened to whole minutes so reruns within the same minute
+    share one cache entry.
+    
+    Args:
+        start_timestamp: Start timestamp
+        end_timestamp: End timestamp
+        
+    Returns:
+        list: List of readings
+    """
+    return _load_historical_readings(
+        firebase_manager, int(start_timestamp) // 60, int(end_timestamp) // 60 + 1
+    )
+
 def main():
     """Main application function."""
     # Display app header
@@ -277,29 +399,12 @@ def display_dashboard():
                 # Get historical data for today's pattern
                 now = datetime.now()
                 start_of_day = datetime(now.year, now.month, now.day).timestamp()
-                historical_readings = firebase_manager.get_historical_readings(start_of_day, now.timestamp())
+                historical_readings = get_historical_readings(start_of_day, now.timestamp())
                 
                 if historical_readings:
                     # Process historical readings into DataFrame format
-                    timestamps = []
-                    flow_rates = []
-                    pressures = []
-                    volumes = []
-                    
-                    for reading in historical_readings:
-                        timestamps.append(datetime.fromtimestamp(reading.get('timestamp', 0)))
-                        flow_rates.append(reading.get('flow_rate', 0))
-                        pressures.append(reading.get('pressure', 0))
-                        # Estimate volume (flow rate * 60 seconds / 1000 to get liters)
-                        volumes.append(reading.get('flow_rate', 0) * 60 / 1000)
-                    
-                    historical_df = pd.DataFrame({
-                        'timestamp': timestamps,
-                        'flow_rate': flow_rates,
-                        'pressure': pressures,
-                        'volume': volumes,
-                        'date': [t.date() for t in timestamps]
-                    })
+                    historical_df = readings_to_frame(historical_readings)
+                    historical_df['date'] = historical_df['timestamp'].dt.date
                     
                     data = {
                         'current': current_data,
@@ -308,19 +413,19 @@ def display_dashboard():
                 else:
                     # No historical data available, fall back to demo
                     st.info("No historical data available from Firebase. Showing demo data.")
-                    data = generate_demo_data()
+                    data = generate_demo_data(demo_seed())
             else:
                 # No data available from Firebase, fall back to demo
                 st.info("No real-time data available from Firebase. Showing demo data.")
-                data = generate_demo_data()
+                data = generate_demo_data(demo_seed())
                 current_data = data['current']
         except Exception as e:
             st.error(f"Error retrieving data from Firebase: {str(e)}")
-            data = generate_demo_data()
+            data = generate_demo_data(demo_seed())
             current_data = data['current']
     else:
         # Get demo data if no Firebase or in demo mode
-        data = generate_demo_data()
+        data = generate_demo_data(demo_seed())
         current_data = data['current']
     
     # Current time
@@ -334,28 +439,8 @@ def display_dashboard():
         flow_rate = current_data['flow_rate']
         st.metric("Flow Rate", f"{flow_rate:.1f} L/min", delta=None)
         
-        # Create a gauge chart for flow rate
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=flow_rate,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Flow Rate (L/min)"},
-            gauge={
-                'axis': {'range': [0, 30], 'tickwidth': 1},
-                'bar': {'color': "#1f77b4"},
-                'steps': [
-                    {'range': [0, 5], 'color': "lightblue"},
-                    {'range': [5, 15], 'color': "royalblue"},
-                    {'range': [15, 30], 'color': "darkblue"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 25
-                }
-            }
-        ))
-        fig.update_layout(height=250)
+        # Gauge chart for flow rate
+        fig = gauge_figure('flow_rate', flow_rate)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -363,28 +448,8 @@ def display_dashboard():
         pressure = current_data['pressure']
         st.metric("Pressure", f"{pressure:.1f} bar", delta=None)
         
-        # Create a gauge chart for pressure
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=pressure,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Pressure (bar)"},
-            gauge={
-                'axis': {'range': [0, 10], 'tickwidth': 1},
-                'bar': {'color': "#ff7f0e"},
-                'steps': [
-                    {'range': [0, 2], 'color': "lightyellow"},
-                    {'range': [2, 6], 'color': "gold"},
-                    {'range': [6, 10], 'color': "orange"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 8
-                }
-            }
-        ))
-        fig.update_layout(height=250)
+        # Gauge chart for pressure
+        fig = gauge_figure('pressure', pressure)
         st.plotly_chart(fig, use_container_width=True)
     
     with col3:
@@ -470,35 +535,18 @@ def display_historical():
             end_timestamp = now.timestamp()
             
             # Retrieve historical data from Firebase
-            historical_readings = firebase_manager.get_historical_readings(start_timestamp, end_timestamp)
+            historical_readings = get_historical_readings(start_timestamp, end_timestamp)
             
             if historical_readings and len(historical_readings) > 0:
                 # Process historical readings into DataFrame format
-                timestamps = []
-                flow_rates = []
-                pressures = []
-                volumes = []
-                
-                for reading in historical_readings:
-                    timestamps.append(datetime.fromtimestamp(reading.get('timestamp', 0)))
-                    flow_rates.append(reading.get('flow_rate', 0))
-                    pressures.append(reading.get('pressure', 0))
-                    # Estimate volume (flow rate * interval minutes / 1000 to get liters)
-                    volumes.append(reading.get('flow_rate', 0) * 60 / 1000)  # Assuming readings every minute
-                
-                historical_data = pd.DataFrame({
-                    'timestamp': timestamps,
-                    'flow_rate': flow_rates,
-                    'pressure': pressures,
-                    'volume': volumes
-                })
+                historical_data = readings_to_frame(historical_readings)
                 
                 # Add datetime column for filtering
                 historical_data['datetime'] = pd.to_datetime(historical_data['timestamp'])
             else:
                 st.info("No historical data available from Firebase for the selected time range. Showing demo data.")
                 # Get demo data if no Firebase data available
-                data = generate_demo_data()
+                data = generate_demo_data(demo_seed())
                 historical_data = data['historical']
                 # Add datetime column for filtering if not present
                 if 'datetime' not in historical_data.columns:
@@ -506,14 +554,14 @@ def display_historical():
         except Exception as e:
             st.error(f"Error retrieving historical data from Firebase: {str(e)}")
             # Fall back to demo data
-            data = generate_demo_data()
+            data = generate_demo_data(demo_seed())
             historical_data = data['historical']
             # Add datetime column for filtering if not present
             if 'datetime' not in historical_data.columns:
                 historical_data['datetime'] = pd.to_datetime(historical_data['timestamp'])
     else:
         # Get demo data if no Firebase or in demo mode
-        data = generate_demo_data()
+        data = generate_demo_data(demo_seed())
         historical_data = data['historical']
         # Add datetime column for filtering if not present
         if 'datetime' not in historical_data.columns: